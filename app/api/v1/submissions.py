@@ -1,6 +1,6 @@
 # app/api/v1/submissions.py
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import Optional
 from uuid import UUID
@@ -30,16 +30,19 @@ def get_submission_service(db: Session = Depends(get_db)) -> SubmissionService:
 @router.post("/", response_model=FormSubmissionResponse, status_code=status.HTTP_201_CREATED)
 async def create_submission(
     submission_data: FormSubmissionCreate,
+    background_tasks: BackgroundTasks,
     service: SubmissionService = Depends(get_submission_service)
 ):
     """
     Submit a completed Kobo form
     
     Creates a new form submission and attempts to sync with Kobo Toolbox.
-    Supports media file uploads and location data.
+    Supports media file uploads and location data. Media files are stored
+    in the background once the submission row has been committed.
     """
     try:
-        submission = await service.create_submission(submission_data)
+        # The request-scoped session stays open until background tasks have run
+        submission = await service.create_submission(submission_data, background_tasks)
         return submission
     except ValueError as e:
         raise HTTPException(
@@ -55,28 +58,52 @@ async def create_submission(
 
 @router.get("/", response_model=FormSubmissionList)
 async def get_submissions(
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (ignored when cursor is given)"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     form_id: Optional[str] = Query(None, description="Filter by Kobo form ID"),
     sync_status: Optional[str] = Query(None, description="Filter by sync status", regex="^(pending|synced|failed)$"),
     username: Optional[str] = Query(None, description="Filter by username"),
+    has_media: Optional[bool] = Query(None, description="Only submissions with (true) or without (false) media files"),
+    latitude: Optional[float] = Query(None, ge=-90, le=90, description="Latitude of the search centre"),
+    longitude: Optional[float] = Query(None, ge=-180, le=180, description="Longitude of the search centre"),
+    radius_m: Optional[float] = Query(None, gt=0, description="Search radius in meters"),
     service: SubmissionService = Depends(get_submission_service)
 ):
     """
     Get paginated list of form submissions
     
-    Supports filtering by form ID, sync status, and username.
+    Supports filtering by form ID, sync status, username, attached media, and distance
+    from a point (latitude, longitude and radius_m must be given together).
     Returns submissions ordered by creation date (newest first).
+    Prefer cursor-based paging (next_cursor) over page numbers for deep pages.
     """
+    radius_args = (latitude, longitude, radius_m)
+    if any(arg is not None for arg in radius_args) and any(arg is None for arg in radius_args):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="latitude, longitude and radius_m must be given together"
+        )
+    
     try:
         result = await service.get_submissions(
             page=page,
             per_page=per_page,
+            cursor=cursor,
             form_id=form_id,
             sync_status=sync_status,
-            username=username
+            username=username,
+            has_media=has_media,
+            latitude=latitude,
+            longitude=longitude,
+            radius_m=radius_m
         )
         return FormSubmissionList(**result)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Failed to get submissions: {e}")
         raise HTTPException(
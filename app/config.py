@@ -23,6 +23,10 @@ class Settings(BaseSettings):
     # Server
     host: str = Field(default="0.0.0.0")
     port: int = Field(default=8000)
+    # Worker processes outside debug (0 or unset = 1). Each worker has its own
+    # engine pool (pool_size 10 + max_overflow 20 = up to 30 connections) and
+    # its own in-process caches, so keep workers * 30 under the database limit.
+    workers: int = Field(default=1)
     
     # Database - Neon PostgreSQL
     database_url: str = Field(default="")
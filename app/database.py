@@ -28,6 +28,7 @@ engine = create_engine(
     max_overflow=20,
     pool_pre_ping=True,  # Validate connections before use
     pool_recycle=3600,   # Recycle connections every hour
+    query_cache_size=1200,  # Compiled statement cache shared by all sessions
     connect_args={
         "sslmode": "require",  # Required for Neon
         "application_name": "wildlife-conservation-api",
@@ -2,12 +2,13 @@
 from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, JSON, Float
 # from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from geoalchemy2 import Geometry
 import uuid
 from datetime import datetime
 
 from app.database import Base
+from app.utils.ids import uuid7
 
 class FormTemplate(Base):
     """Cached Kobo form templates"""
@@ -30,17 +31,18 @@ class FormSubmission(Base):
     """Form submissions from mobile apps"""
     __tablename__ = "form_submissions"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)  # Time-ordered for index locality
     form_template_id = Column(UUID(as_uuid=True), ForeignKey("form_templates.id"), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     
     # Submission data
-    submission_data = Column(JSON, nullable=False)  # Form answers
+    submission_data = Column(JSONB, nullable=False)  # Form answers; GIN-indexed for @> lookups
+    payload_sha256 = Column(String(64), unique=True, index=True)  # Hash of the submitted payload; unique, so retries dedupe on insert
     device_id = Column(String)
     app_version = Column(String)
     
     # Location data
-    location = Column(Geometry('POINT', srid=4326))
+    location = Column(Geometry('POINT', srid=4326, spatial_index=False))  # SP-GiST index created by migration script
     location_accuracy = Column(Float)
     altitude = Column(Float)
     
@@ -66,7 +68,7 @@ class MediaFile(Base):
     """Media files attached to form submissions"""
     __tablename__ = "media_files"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     submission_id = Column(UUID(as_uuid=True), ForeignKey("form_submissions.id"), nullable=False)
     
     # File details
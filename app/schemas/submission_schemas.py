@@ -36,7 +36,8 @@ class FormSubmissionResponse(BaseModel):
     kobo_form_id: str
     status: str
     message: str
-    created_at: str
+    created_at: datetime
+    media_files: List[Dict[str, Any]] = []  # Pending uploads when files are written in the background
 
 class FormSubmissionList(BaseModel):
     """Paginated list of form submissions"""
@@ -45,6 +46,7 @@ class FormSubmissionList(BaseModel):
     page: int
     per_page: int
     total_pages: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
 
 class FormSubmissionDetail(BaseModel):
     """Detailed form submission"""
@@ -52,7 +54,8 @@ class FormSubmissionDetail(BaseModel):
     kobo_form_id: str
     submission_data: Dict[str, Any]
     status: str
-    created_at: str
+    created_at: datetime
+    media_files: List[Dict[str, Any]] = []  # Attached files, with the ids the media download route takes
 
 class SyncRequest(BaseModel):
     """Request to sync submissions with Kobo"""
@@ -67,7 +70,7 @@ class SyncResponse(BaseModel):
     submissions_processed: int
     submissions_synced: int
     submissions_failed: int
-    started_at: str
+    started_at: datetime
 
 class SubmissionStats(BaseModel):
     """Statistics about form submissions"""
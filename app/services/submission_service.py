@@ -1,74 +1,347 @@
 # app/services/submission_service.py
 import os
+import re
+import math
+import asyncio
 import uuid
 import base64
+import hashlib
+import json
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, desc
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from fastapi import BackgroundTasks
+from sqlalchemy import DateTime, Float, and_, bindparam, cast, delete, func, desc, insert, select, tuple_, update
+from geoalchemy2 import Geography
 from geoalchemy2.functions import ST_MakePoint
+from geoalchemy2.shape import to_shape
+import orjson
+from cachetools import TTLCache
 
+from app.database import SessionLocal
 from app.models.submission_models import FormSubmission, FormTemplate, MediaFile, User, SyncLog
 from app.schemas.submission_schemas import FormSubmissionCreate, LocationData, MediaFileUpload
 from app.services.kobo_service import KoboService
+from app.utils.ids import uuid7
 import logging
 
 logger = logging.getLogger(__name__)
 
+_splitext = os.path.splitext
+_uuid4 = uuid.uuid4
+
+# kobo_form_id -> form_templates.id. Templates change on the order of hours,
+# submissions arrive every few seconds; only committed ids are cached.
+_template_id_cache: TTLCache = TTLCache(maxsize=1024, ttl=300)
+
+# username -> users.id, on the same terms; only committed ids are cached
+_user_id_cache: TTLCache = TTLCache(maxsize=4096, ttl=300)
+
+# Coordinates decoded by PostGIS in the same SELECT as the row itself
+LONGITUDE = func.ST_X(FormSubmission.location).label("longitude")
+LATITUDE = func.ST_Y(FormSubmission.location).label("latitude")
+
+# Columns needed to render a submission in list responses, selected as plain
+# rows (no ORM objects). Leaves out the submission_data JSON blob, which is
+# only returned by the detail endpoint.
+LIST_COLUMNS = (
+    FormSubmission.id,
+    FormTemplate.kobo_form_id,
+    FormSubmission.sync_status,
+    FormSubmission.created_at,
+    FormSubmission.submitted_at,
+    User.username,
+    FormSubmission.device_id,
+    FormSubmission.location_accuracy,
+    LONGITUDE,
+    LATITUDE,
+)
+
+# Base list query; filters and pagination are added per request
+LIST_QUERY = select(*LIST_COLUMNS).select_from(FormSubmission).join(
+    FormTemplate
+).outerjoin(User)
+
+# Dashboard figures in one pass over form_submissions. Built once with the
+# date boundaries as bound parameters, so each call only binds values and
+# reuses the compiled statement.
+STATS_QUERY = select(
+    func.count().label("total_submissions"),
+    func.count().filter(FormSubmission.sync_status == "pending").label("pending_sync"),
+    func.count().filter(FormSubmission.sync_status == "synced").label("synced"),
+    func.count().filter(FormSubmission.sync_status == "failed").label("failed_sync"),
+    func.count().filter(
+        FormSubmission.created_at >= bindparam("today_start", type_=DateTime)
+    ).label("today_submissions"),
+    func.count().filter(
+        FormSubmission.created_at >= bindparam("week_start", type_=DateTime)
+    ).label("this_week_submissions"),
+    func.count(func.distinct(FormSubmission.form_template_id)).label("forms_with_submissions")
+)
+
+# Radius filter built once with bound parameters, so every "nearby" query
+# shares the same SQL text and compiled-statement cache entry. The geometry
+# bbox overlap (&&) lets the planner use the spatial index on location; the
+# exact distance check then runs on the surviving candidates only, using a
+# sphere rather than the (much slower) spheroid. Circles that reach a pole
+# or cross the antimeridian have no usable bbox and take the exact check alone.
+_NEAR_POINT = func.ST_SetSRID(
+    func.ST_MakePoint(bindparam("near_lon", type_=Float), bindparam("near_lat", type_=Float)),
+    4326
+)
+WITHIN_RADIUS_EXACT = func.ST_DWithin(
+    cast(FormSubmission.location, Geography),
+    cast(_NEAR_POINT, Geography),
+    bindparam("radius_m", type_=Float),
+    False
+)
+WITHIN_RADIUS = and_(
+    FormSubmission.location.op("&&")(
+        func.ST_Expand(_NEAR_POINT, bindparam("radius_deg", type_=Float))
+    ),
+    WITHIN_RADIUS_EXACT
+)
+
+# Submissions with at least one attached media file; correlates with the
+# outer form_submissions row and is served by idx_media_files_submission_id
+HAS_MEDIA = select(MediaFile.id).where(
+    MediaFile.submission_id == FormSubmission.id
+).exists()
+
+# Shortest length of one degree (of latitude, at the equator) in meters
+_MIN_METERS_PER_DEGREE = 110_574.0
+
+
+def _radius_in_degrees(radius_m: float, latitude: float) -> float:
+    """
+    Conservative bbox half-width in degrees covering radius_m around latitude
+    
+    The widest longitude span of a circle on the sphere is
+    asin(sin(radius) / cos(latitude)), which also bounds its latitude span.
+    Returns math.inf when the circle reaches a pole, where no finite
+    longitude range covers it.
+    """
+    radius = math.radians(radius_m / _MIN_METERS_PER_DEGREE)
+    colatitude = math.pi / 2 - abs(math.radians(latitude))
+    if radius >= colatitude:
+        return math.inf
+    return math.degrees(math.asin(math.sin(radius) / math.sin(colatitude)))
+
+
+def _radius_filter(latitude: float, longitude: float, radius_m: float):
+    """Radius clause and its bound parameters for a circle around a point"""
+    params = {"near_lat": latitude, "near_lon": longitude, "radius_m": radius_m}
+    radius_deg = _radius_in_degrees(radius_m, latitude)
+    if abs(longitude) + radius_deg >= 180:
+        # The bbox would have to wrap the antimeridian or cover a pole
+        return WITHIN_RADIUS_EXACT, params
+    params["radius_deg"] = radius_deg
+    return WITHIN_RADIUS, params
+
+
+def _encode_cursor(created_at: datetime, submission_id: uuid.UUID) -> str:
+    """Opaque keyset cursor pointing just past the given row"""
+    raw = f"{created_at.isoformat()}|{submission_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str):
+    """Inverse of _encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        created_at, submission_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(submission_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+# Base64 characters decoded per write; a multiple of 4 so that every chunk
+# decodes independently
+_BASE64_CHUNK = 64 * 1024
+
+
+# Line breaks, tabs and spaces, which would shift the chunk boundaries
+_BASE64_WHITESPACE = re.compile(r"\s+")
+
+
+def _write_base64_file(encoded: str, file_path: str) -> None:
+    """
+    Decode base64 text into file_path one chunk at a time
+    
+    Accepts data: URIs and line-wrapped input. Any other character outside
+    the base64 alphabet raises binascii.Error, and the partly written file
+    is removed before the error propagates.
+    """
+    if encoded.startswith("data:"):
+        # data:image/jpeg;base64,<payload>
+        encoded = encoded.partition(",")[2]
+    encoded = _BASE64_WHITESPACE.sub("", encoded)
+    
+    try:
+        with open(file_path, 'wb') as f:
+            for start in range(0, len(encoded), _BASE64_CHUNK):
+                f.write(base64.b64decode(encoded[start:start + _BASE64_CHUNK], validate=True))
+    except Exception:
+        _remove_files([file_path])
+        raise
+
+
+def _remove_files(file_paths: List[str]):
+    """Unlink files, ignoring ones that are already gone"""
+    for file_path in file_paths:
+        # One unlink per file instead of exists() + remove(), and no race
+        # between the check and the delete
+        try:
+            os.unlink(file_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to delete media file {file_path}: {e}")
+
+
+def _payload_digest(submission_data: FormSubmissionCreate) -> str:
+    """
+    SHA-256 of the canonical JSON form of a submission
+    
+    Covers the answers, the device, user and submitted_at identity, and each
+    media file by its metadata and content hash. Only a byte-for-byte retry
+    matches; the same answers with other media or from another observation
+    are a new submission.
+    """
+    payload = submission_data.model_dump(exclude={"media_files"})
+    payload["media_files"] = [
+        dict(
+            media.model_dump(exclude={"file_data"}),
+            sha256=hashlib.sha256(media.file_data.encode()).hexdigest()
+        )
+        for media in submission_data.media_files or ()
+    ]
+    try:
+        canonical = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    except orjson.JSONEncodeError:
+        # orjson rejects integers wider than 64 bits; the stdlib does not
+        canonical = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(canonical).hexdigest()
+
+
 class SubmissionService:
     def __init__(self, db: Session, kobo_service: KoboService):
         self.db = db
         self.kobo_service = kobo_service
         self.media_storage_path = "storage/media"
         os.makedirs(self.media_storage_path, exist_ok=True)
+        # Directory prefix with trailing separator, for building file paths by concatenation
+        self._media_path_prefix = os.path.join(self.media_storage_path, "")
 
-    async def create_submission(self, submission_data: FormSubmissionCreate) -> Dict[str, Any]:
-        """Create a new form submission and save to database"""
+    async def create_submission(
+        self,
+        submission_data: FormSubmissionCreate,
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> Dict[str, Any]:
+        """
+        Create a new form submission and save to database
+        
+        When background_tasks is given, media files are written after the
+        response has been sent instead of on the request path.
+        """
         try:
+            # Mobile clients retry on flaky connections; an identical payload
+            # is the same submission, so it is stored once
+            payload_sha256 = _payload_digest(submission_data)
+            
+            # One clock read shared by every timestamp written for this submission
+            now = datetime.utcnow()
+            
             # Get or create form template
-            form_template = await self._get_or_create_form_template(submission_data.kobo_form_id)
+            form_template_id = await self._get_or_create_form_template(submission_data.kobo_form_id)
             
             # Get or create user
-            user = None
+            user_id = None
             if submission_data.username:
-                user = await self._get_or_create_user(submission_data.username)
+                user_id = await self._get_or_create_user(submission_data.username)
             
             # Create submission record
-            submission = FormSubmission(
-                form_template_id=form_template.id,
-                user_id=user.id if user else None,
+            values = dict(
+                form_template_id=form_template_id,
+                user_id=user_id,
                 submission_data=submission_data.submission_data,
+                payload_sha256=payload_sha256,
                 device_id=submission_data.device_id,
                 app_version=submission_data.app_version,
                 submitted_at=submission_data.submitted_at,
+                received_at=now,
+                created_at=now,
+                updated_at=now,
                 sync_status="pending"
             )
             
             # Add location if provided
             if submission_data.location:
-                submission.location = ST_MakePoint(
-                    submission_data.location.longitude,
-                    submission_data.location.latitude
+                values.update(
+                    location=ST_MakePoint(
+                        submission_data.location.longitude,
+                        submission_data.location.latitude
+                    ),
+                    location_accuracy=submission_data.location.accuracy,
+                    altitude=submission_data.location.altitude
                 )
-                submission.location_accuracy = submission_data.location.accuracy
-                submission.altitude = submission_data.location.altitude
             
-            self.db.add(submission)
+            # The unique payload_sha256 index arbitrates concurrent retries:
+            # exactly one insert wins, the others get no row back
+            submission_id = self.db.execute(
+                pg_insert(FormSubmission)
+                .values(**values)
+                .on_conflict_do_nothing(index_elements=[FormSubmission.payload_sha256])
+                .returning(FormSubmission.id)
+            ).scalar_one_or_none()
+            
+            if submission_id is None:
+                existing = self.db.execute(
+                    select(FormSubmission.id, FormSubmission.created_at).where(
+                        FormSubmission.payload_sha256 == payload_sha256
+                    )
+                ).one()
+                self.db.rollback()
+                logger.info(f"Duplicate payload for submission {existing.id}, not stored again")
+                return {
+                    "id": existing.id,
+                    "kobo_form_id": submission_data.kobo_form_id,
+                    "status": "received",
+                    "message": "Submission already received",
+                    "created_at": existing.created_at
+                }
+            
+            # Handle media files inline in the same transaction when there is
+            # no background task to hand them to; otherwise record them as
+            # pending now and write the files after the response is sent
+            media_files = []
+            pending_blobs = []
+            if submission_data.media_files:
+                if background_tasks is None:
+                    await self._save_media_files(submission_id, submission_data.media_files, commit=False)
+                else:
+                    media_files, pending_blobs = self._queue_media_files(
+                        submission_id, submission_data.media_files
+                    )
+            
+            # Template, user, submission and media rows: one commit, one WAL flush
             self.db.commit()
-            self.db.refresh(submission)
+            _template_id_cache[submission_data.kobo_form_id] = form_template_id
+            if user_id is not None:
+                _user_id_cache[submission_data.username] = user_id
             
-            # Handle media files
-            if submission_data.media_files:
-                await self._save_media_files(submission.id, submission_data.media_files)
+            if pending_blobs:
+                background_tasks.add_task(self._write_media_blobs, pending_blobs)
             
-            logger.info(f"Created submission {submission.id} for form {submission_data.kobo_form_id}")
+            logger.info(f"Created submission {submission_id} for form {submission_data.kobo_form_id}")
             
             return {
-                "id": submission.id,
+                "id": submission_id,
                 "kobo_form_id": submission_data.kobo_form_id,
                 "status": "received",
                 "message": "Submission saved successfully",
-                "created_at": submission.created_at.isoformat()
+                "created_at": now,
+                "media_files": media_files
             }
             
         except Exception as e:
@@ -83,34 +356,71 @@ class SubmissionService:
         try:
             page = kwargs.get("page", 1)
             per_page = kwargs.get("per_page", 20)
+            cursor = kwargs.get("cursor")
             form_id = kwargs.get("form_id")
             sync_status = kwargs.get("sync_status")
             username = kwargs.get("username")
+            has_media = kwargs.get("has_media")
+            latitude = kwargs.get("latitude")
+            longitude = kwargs.get("longitude")
+            radius_m = kwargs.get("radius_m")
             
-            query = self.db.query(FormSubmission).join(FormTemplate)
+            stmt = LIST_QUERY
+            params = {}
             
             # Apply filters
             if form_id:
-                query = query.filter(FormTemplate.kobo_form_id == form_id)
+                stmt = stmt.where(FormTemplate.kobo_form_id == form_id)
             if sync_status:
-                query = query.filter(FormSubmission.sync_status == sync_status)
+                stmt = stmt.where(FormSubmission.sync_status == sync_status)
             if username:
-                query = query.join(User).filter(User.username == username)
-            
-            # Get total count
-            total = query.count()
-            
-            # Apply pagination and ordering
-            submissions = query.order_by(desc(FormSubmission.created_at)).offset(
-                (page - 1) * per_page
-            ).limit(per_page).all()
+                stmt = stmt.where(User.username == username)
+            if has_media is not None:
+                stmt = stmt.where(HAS_MEDIA if has_media else ~HAS_MEDIA)
+            if latitude is not None and longitude is not None and radius_m is not None:
+                radius_filter, radius_params = _radius_filter(latitude, longitude, radius_m)
+                stmt = stmt.where(radius_filter)
+                params.update(radius_params)
+            
+            # Newest first; id breaks ties so the keyset order is total
+            stmt = stmt.order_by(desc(FormSubmission.created_at), desc(FormSubmission.id))
+            
+            # Apply pagination: keyset when a cursor is given, legacy offset otherwise
+            if cursor:
+                # Reject a malformed cursor before running any query
+                cursor_created_at, cursor_id = _decode_cursor(cursor)
+                # The cursor filter narrows the rows, so the total is counted separately
+                total = self._count_rows(stmt, params)
+                stmt = stmt.where(
+                    tuple_(FormSubmission.created_at, FormSubmission.id) < (cursor_created_at, cursor_id)
+                )
+                rows = self.db.execute(stmt.limit(per_page), params).all()
+            else:
+                # COUNT(*) OVER () returns the filtered total alongside the page rows
+                windowed = stmt.add_columns(func.count().over().label("total_count"))
+                rows = self.db.execute(
+                    windowed.offset((page - 1) * per_page).limit(per_page), params
+                ).all()
+                if rows:
+                    total = rows[0].total_count
+                elif page > 1:
+                    # Past the last page there is no row to carry the total
+                    total = self._count_rows(stmt, params)
+                else:
+                    total = 0
+            
+            next_cursor = None
+            if len(rows) == per_page:
+                last = rows[-1]
+                next_cursor = _encode_cursor(last.created_at, last.id)
             
             return {
-                "submissions": [self._to_response_dict(sub) for sub in submissions],
+                "submissions": [self._to_response_dict(row) for row in rows],
                 "total": total,
                 "page": page,
                 "per_page": per_page,
-                "total_pages": (total + per_page - 1) // per_page
+                "total_pages": (total + per_page - 1) // per_page,
+                "next_cursor": next_cursor
             }
             
         except Exception as e:
@@ -119,48 +429,52 @@ class SubmissionService:
             logger.error(f"Get submissions traceback: {traceback.format_exc()}")
             raise
 
+    def _count_rows(self, stmt, params: Dict[str, Any]) -> int:
+        """Count the rows a list query would return without pagination"""
+        return self.db.execute(
+            select(func.count()).select_from(stmt.order_by(None).subquery()), params
+        ).scalar_one()
+
     async def get_submission(self, submission_id: uuid.UUID) -> Optional[Dict[str, Any]]:
         """Get submission by ID"""
         try:
-            submission = self.db.query(FormSubmission).filter(
-                FormSubmission.id == submission_id
-            ).first()
+            # Primary-key lookup: served from the identity map when possible
+            submission = self.db.get(
+                FormSubmission,
+                submission_id,
+                options=[
+                    joinedload(FormSubmission.form_template),
+                    joinedload(FormSubmission.user),
+                    selectinload(FormSubmission.media_files)
+                ]
+            )
             
             if not submission:
                 return None
             
-            # Get media files
-            media_files = self.db.query(MediaFile).filter(
-                MediaFile.submission_id == submission_id
-            ).all()
+            media_files = submission.media_files
             
             result = {
                 "id": submission.id,
                 "kobo_form_id": submission.form_template.kobo_form_id,
                 "submission_data": submission.submission_data,
                 "status": submission.sync_status,
-                "created_at": submission.created_at.isoformat(),
-                "submitted_at": submission.submitted_at.isoformat(),
+                "created_at": submission.created_at,
+                "submitted_at": submission.submitted_at,
                 "username": submission.user.username if submission.user else None,
                 "device_id": submission.device_id,
                 "media_files": [self._media_file_to_dict(mf) for mf in media_files]
             }
             
-            # Add location if available
-            if submission.location:
-                from sqlalchemy import func
-                coords = self.db.query(
-                    func.ST_X(submission.location).label('longitude'),
-                    func.ST_Y(submission.location).label('latitude')
-                ).first()
-                
-                if coords:
-                    result["location"] = {
-                        "latitude": float(coords.latitude),
-                        "longitude": float(coords.longitude),
-                        "accuracy": submission.location_accuracy,
-                        "altitude": submission.altitude
-                    }
+            # Add location if available (decoded from the loaded WKB, no extra query)
+            if submission.location is not None:
+                point = to_shape(submission.location)
+                result["location"] = {
+                    "latitude": point.y,
+                    "longitude": point.x,
+                    "accuracy": submission.location_accuracy,
+                    "altitude": submission.altitude
+                }
             
             return result
             
@@ -180,7 +494,7 @@ class SubmissionService:
                 "submissions_processed": 0,
                 "submissions_synced": 0,
                 "submissions_failed": 0,
-                "started_at": datetime.now().isoformat()
+                "started_at": datetime.now()
             }
         except Exception as e:
             logger.error(f"Failed to sync submissions: {e}")
@@ -195,29 +509,11 @@ class SubmissionService:
             today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
             week_start = today_start - timedelta(days=7)
             
-            stats = {
-                "total_submissions": self.db.query(FormSubmission).count(),
-                "pending_sync": self.db.query(FormSubmission).filter(
-                    FormSubmission.sync_status == "pending"
-                ).count(),
-                "synced": self.db.query(FormSubmission).filter(
-                    FormSubmission.sync_status == "synced"
-                ).count(),
-                "failed_sync": self.db.query(FormSubmission).filter(
-                    FormSubmission.sync_status == "failed"
-                ).count(),
-                "today_submissions": self.db.query(FormSubmission).filter(
-                    FormSubmission.created_at >= today_start
-                ).count(),
-                "this_week_submissions": self.db.query(FormSubmission).filter(
-                    FormSubmission.created_at >= week_start
-                ).count(),
-                "forms_with_submissions": self.db.query(FormTemplate.id).join(
-                    FormSubmission
-                ).distinct().count()
-            }
+            row = self.db.execute(
+                STATS_QUERY, {"today_start": today_start, "week_start": week_start}
+            ).one()
             
-            return stats
+            return dict(row._mapping)
             
         except Exception as e:
             logger.error(f"Failed to get submission stats: {e}")
@@ -228,30 +524,29 @@ class SubmissionService:
     async def delete_submission(self, submission_id: uuid.UUID) -> bool:
         """Delete a form submission"""
         try:
-            submission = self.db.query(FormSubmission).filter(
-                FormSubmission.id == submission_id
-            ).first()
+            # Only the paths are needed for the filesystem cleanup
+            file_paths = self.db.execute(
+                select(MediaFile.file_path).where(
+                    MediaFile.submission_id == submission_id,
+                    MediaFile.file_path.isnot(None)
+                )
+            ).scalars().all()
             
-            if not submission:
+            # Delete media rows first, in one statement
+            self.db.execute(delete(MediaFile).where(MediaFile.submission_id == submission_id))
+            
+            # Delete submission without loading it
+            result = self.db.execute(delete(FormSubmission).where(FormSubmission.id == submission_id))
+            if result.rowcount == 0:
+                self.db.rollback()
                 return False
             
-            # Delete media files first
-            media_files = self.db.query(MediaFile).filter(
-                MediaFile.submission_id == submission_id
-            ).all()
-            
-            for media_file in media_files:
-                if media_file.file_path and os.path.exists(media_file.file_path):
-                    try:
-                        os.remove(media_file.file_path)
-                    except Exception as e:
-                        logger.warning(f"Failed to delete media file {media_file.file_path}: {e}")
-                self.db.delete(media_file)
-            
-            # Delete submission
-            self.db.delete(submission)
             self.db.commit()
             
+            # Files go only once the rows are gone, so a rollback never
+            # leaves rows pointing at deleted files
+            _remove_files(file_paths)
+            
             return True
             
         except Exception as e:
@@ -264,14 +559,9 @@ class SubmissionService:
     async def get_media_file(self, submission_id: uuid.UUID, media_id: uuid.UUID):
         """Get media file for download"""
         try:
-            media_file = self.db.query(MediaFile).filter(
-                and_(
-                    MediaFile.id == media_id,
-                    MediaFile.submission_id == submission_id
-                )
-            ).first()
+            media_file = self.db.get(MediaFile, media_id)
             
-            if not media_file:
+            if not media_file or media_file.submission_id != submission_id:
                 return None
             
             if not media_file.file_path or not os.path.exists(media_file.file_path):
@@ -293,17 +583,17 @@ class SubmissionService:
     async def resync_single_submission(self, submission_id: uuid.UUID) -> bool:
         """Resync a single submission"""
         try:
-            submission = self.db.query(FormSubmission).filter(
-                FormSubmission.id == submission_id
-            ).first()
+            # Mark for resync in one UPDATE; no row means no such submission
+            result = self.db.execute(
+                update(FormSubmission)
+                .where(FormSubmission.id == submission_id)
+                .values(sync_status="pending", sync_attempts=0, sync_error=None)
+            )
             
-            if not submission:
+            if result.rowcount == 0:
+                self.db.rollback()
                 return False
             
-            # Mark for resync
-            submission.sync_status = "pending"
-            submission.sync_attempts = 0
-            submission.sync_error = None
             self.db.commit()
             
             return True
@@ -316,30 +606,37 @@ class SubmissionService:
             raise
 
     # Helper methods
-    async def _get_or_create_form_template(self, kobo_form_id: str) -> FormTemplate:
-        """Get existing form template or create from Kobo"""
+    async def _get_or_create_form_template(self, kobo_form_id: str) -> uuid.UUID:
+        """
+        Get existing form template id or create the template from Kobo
+        
+        Ids of known templates come from an in-process TTL cache. On a miss,
+        INSERT ... ON CONFLICT DO NOTHING RETURNING creates the row; when it
+        already exists nothing is written or locked and its id is selected
+        instead. Committed by the caller.
+        """
+        template_id = _template_id_cache.get(kobo_form_id)
+        if template_id is not None:
+            return template_id
+        
         try:
-            template = self.db.query(FormTemplate).filter(
-                FormTemplate.kobo_form_id == kobo_form_id
-            ).first()
-            
-            if template and template.is_active:
-                return template
-            
             # Create basic template (in real app, fetch from Kobo)
-            if not template:
-                template = FormTemplate(
-                    kobo_form_id=kobo_form_id,
-                    title=f"Form {kobo_form_id}",
-                    description="Auto-created form template",
-                    form_structure={"type": "basic_form"},
-                    version="1.0"
-                )
-                self.db.add(template)
-                self.db.commit()
-                self.db.refresh(template)
-            
-            return template
+            stmt = pg_insert(FormTemplate).values(
+                kobo_form_id=kobo_form_id,
+                title=f"Form {kobo_form_id}",
+                description="Auto-created form template",
+                form_structure={"type": "basic_form"},
+                version="1.0"
+            ).on_conflict_do_nothing(
+                index_elements=[FormTemplate.kobo_form_id]
+            ).returning(FormTemplate.id)
+            
+            template_id = self.db.execute(stmt).scalar_one_or_none()
+            if template_id is None:
+                template_id = self.db.execute(
+                    select(FormTemplate.id).where(FormTemplate.kobo_form_id == kobo_form_id)
+                ).scalar_one()
+            return template_id
             
         except Exception as e:
             self.db.rollback()
@@ -348,18 +645,29 @@ class SubmissionService:
             logger.error(f"Form template traceback: {traceback.format_exc()}")
             raise
 
-    async def _get_or_create_user(self, username: str) -> User:
-        """Get existing user or create new one"""
+    async def _get_or_create_user(self, username: str) -> uuid.UUID:
+        """
+        Get the id of an existing user or create a new one
+        
+        Same scheme as form templates: TTL-cached ids, and on a miss an
+        INSERT ... ON CONFLICT DO NOTHING that only writes for new users.
+        Committed by the caller.
+        """
+        user_id = _user_id_cache.get(username)
+        if user_id is not None:
+            return user_id
+        
         try:
-            user = self.db.query(User).filter(User.username == username).first()
-            
-            if not user:
-                user = User(username=username)
-                self.db.add(user)
-                self.db.commit()
-                self.db.refresh(user)
+            stmt = pg_insert(User).values(username=username).on_conflict_do_nothing(
+                index_elements=[User.username]
+            ).returning(User.id)
             
-            return user
+            user_id = self.db.execute(stmt).scalar_one_or_none()
+            if user_id is None:
+                user_id = self.db.execute(
+                    select(User.id).where(User.username == username)
+                ).scalar_one()
+            return user_id
             
         except Exception as e:
             self.db.rollback()
@@ -368,52 +676,24 @@ class SubmissionService:
             logger.error(f"User creation traceback: {traceback.format_exc()}")
             raise
 
-    async def _save_media_files(self, submission_id: uuid.UUID, media_files: List[MediaFileUpload]):
-        """Save media files to storage"""
+    async def _save_media_files(
+        self,
+        submission_id: uuid.UUID,
+        media_files: List[MediaFileUpload],
+        commit: bool = True
+    ):
+        """Save media files to storage (commit=False leaves committing to the caller)"""
         try:
-            for media_data in media_files:
-                try:
-                    # Generate unique filename
-                    file_extension = os.path.splitext(media_data.filename)[1]
-                    unique_filename = f"{uuid.uuid4()}{file_extension}"
-                    file_path = os.path.join(self.media_storage_path, unique_filename)
-                    
-                    # Decode and save file
-                    file_data = base64.b64decode(media_data.file_data)
-                    with open(file_path, 'wb') as f:
-                        f.write(file_data)
-                    
-                    # Create database record
-                    media_file = MediaFile(
-                        submission_id=submission_id,
-                        filename=unique_filename,
-                        original_filename=media_data.filename,
-                        file_type=media_data.file_type,
-                        mime_type=media_data.mime_type,
-                        file_size=media_data.file_size,
-                        file_path=file_path,
-                        question_name=media_data.question_name,
-                        upload_status="uploaded"
-                    )
-                    
-                    self.db.add(media_file)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to save media file {media_data.filename}: {e}")
-                    # Create failed record
-                    media_file = MediaFile(
-                        submission_id=submission_id,
-                        filename=media_data.filename,
-                        original_filename=media_data.filename,
-                        file_type=media_data.file_type,
-                        mime_type=media_data.mime_type,
-                        file_size=media_data.file_size,
-                        question_name=media_data.question_name,
-                        upload_status="failed"
-                    )
-                    self.db.add(media_file)
+            # Files are decoded and written concurrently, then recorded
+            # with one multi-row INSERT
+            rows = await asyncio.gather(
+                *(self._store_media_file(submission_id, media_data) for media_data in media_files)
+            )
             
-            self.db.commit()
+            if rows:
+                self.db.execute(insert(MediaFile), rows)
+            if commit:
+                self.db.commit()
             
         except Exception as e:
             self.db.rollback()
@@ -422,34 +702,175 @@ class SubmissionService:
             logger.error(f"Save media files traceback: {traceback.format_exc()}")
             raise
 
-    def _to_response_dict(self, submission: FormSubmission) -> Dict[str, Any]:
-        """Convert database model to response dictionary"""
+    def _queue_media_files(
+        self,
+        submission_id: uuid.UUID,
+        media_files: List[MediaFileUpload]
+    ) -> tuple:
+        """
+        Insert pending media_files rows ahead of writing the files
+        
+        Returns the rows for the response and the (id, path, data) triples
+        to hand to _write_media_blobs. Ids are generated here so the client
+        gets them before any file has been written.
+        """
+        rows = []
+        pending_blobs = []
+        for media_data in media_files:
+            media_id = uuid7()
+            unique_filename = f"{_uuid4().hex}{_splitext(media_data.filename)[1]}"
+            file_path = self._media_path_prefix + unique_filename
+            rows.append({
+                "id": media_id,
+                "submission_id": submission_id,
+                "filename": unique_filename,
+                "original_filename": media_data.filename,
+                "file_type": media_data.file_type,
+                "mime_type": media_data.mime_type,
+                "file_size": media_data.file_size,
+                "file_path": file_path,
+                "question_name": media_data.question_name,
+                "upload_status": "pending"
+            })
+            pending_blobs.append((media_id, file_path, media_data.file_data))
+        
+        self.db.execute(insert(MediaFile), rows)
+        
+        media = [
+            {
+                "id": row["id"],
+                "filename": row["original_filename"],
+                "question_name": row["question_name"],
+                "upload_status": row["upload_status"]
+            }
+            for row in rows
+        ]
+        return media, pending_blobs
+
+    async def _write_media_blobs(self, pending_blobs: List[tuple]):
+        """
+        Write queued media files and record each upload_status
+        
+        Runs as a background task after the response has been sent, when the
+        request's session may already be closed, so it uses a session of its
+        own. Never raises: on failure the rows are marked failed instead of
+        staying pending.
+        """
+        results = await asyncio.gather(
+            *(self._write_media_blob(file_path, file_data) for _, file_path, file_data in pending_blobs)
+        )
+        written = {}
+        failed_ids = []
+        for (media_id, file_path, _), ok in zip(pending_blobs, results):
+            if ok:
+                written[media_id] = file_path
+            else:
+                failed_ids.append(media_id)
+        
+        db = SessionLocal()
+        try:
+            uploaded_ids = set()
+            if written:
+                uploaded_ids = set(db.execute(
+                    update(MediaFile)
+                    .where(MediaFile.id.in_(list(written)))
+                    .values(upload_status="uploaded")
+                    .returning(MediaFile.id)
+                ).scalars())
+            if failed_ids:
+                db.execute(
+                    update(MediaFile)
+                    .where(MediaFile.id.in_(failed_ids))
+                    .values(upload_status="failed", file_path=None)
+                )
+            db.commit()
+            
+            # Rows deleted along with their submission in the meantime match
+            # nothing; their files would never be cleaned up otherwise
+            _remove_files([
+                file_path for media_id, file_path in written.items()
+                if media_id not in uploaded_ids
+            ])
+            
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to write media files: {e}")
+            import traceback
+            logger.error(f"Write media files traceback: {traceback.format_exc()}")
+            self._mark_media_failed(db, [media_id for media_id, _, _ in pending_blobs])
+            _remove_files(list(written.values()))
+        finally:
+            db.close()
+
+    @staticmethod
+    def _mark_media_failed(db: Session, media_ids: List[uuid.UUID]):
+        """Best-effort: record media rows as failed so none stays pending"""
+        try:
+            db.execute(
+                update(MediaFile)
+                .where(MediaFile.id.in_(media_ids))
+                .values(upload_status="failed", file_path=None)
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to mark media files {media_ids} as failed: {e}")
+
+    async def _write_media_blob(self, file_path: str, file_data: str) -> bool:
+        """Decode and write one base64 media file, returning whether it was written"""
+        try:
+            # Decode and save file off the event loop, without ever holding
+            # the whole decoded file in memory
+            await asyncio.get_running_loop().run_in_executor(
+                None, _write_base64_file, file_data, file_path
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save media file {file_path}: {e}")
+            return False
+
+    async def _store_media_file(self, submission_id: uuid.UUID, media_data: MediaFileUpload) -> Dict[str, Any]:
+        """Decode and write one media file, returning its media_files row"""
+        row = {
+            "submission_id": submission_id,
+            "original_filename": media_data.filename,
+            "file_type": media_data.file_type,
+            "mime_type": media_data.mime_type,
+            "file_size": media_data.file_size,
+            "question_name": media_data.question_name
+        }
+        
+        # Generate unique filename
+        unique_filename = f"{_uuid4().hex}{_splitext(media_data.filename)[1]}"
+        file_path = self._media_path_prefix + unique_filename
+        
+        if await self._write_media_blob(file_path, media_data.file_data):
+            row.update(filename=unique_filename, file_path=file_path, upload_status="uploaded")
+        else:
+            # Record the failure so the client can see it
+            row.update(filename=media_data.filename, file_path=None, upload_status="failed")
+        
+        return row
+
+    def _to_response_dict(self, row) -> Dict[str, Any]:
+        """Convert a LIST_COLUMNS result row to response dictionary"""
         try:
             result = {
-                "id": submission.id,
-                "kobo_form_id": submission.form_template.kobo_form_id,
-                "status": submission.sync_status,
-                "created_at": submission.created_at.isoformat(),
-                "submitted_at": submission.submitted_at.isoformat(),
-                "username": submission.user.username if submission.user else None,
-                "device_id": submission.device_id
+                "id": row.id,
+                "kobo_form_id": row.kobo_form_id,
+                "status": row.sync_status,
+                "created_at": row.created_at,
+                "submitted_at": row.submitted_at,
+                "username": row.username,
+                "device_id": row.device_id
             }
             
-            # Fix the location handling
-            if submission.location:
-                # Use PostGIS functions to extract coordinates
-                from sqlalchemy import func
-                coords = self.db.query(
-                    func.ST_X(submission.location).label('longitude'),
-                    func.ST_Y(submission.location).label('latitude')
-                ).first()
-                
-                if coords:
-                    result["location"] = {
-                        "latitude": float(coords.latitude),
-                        "longitude": float(coords.longitude),
-                        "accuracy": submission.location_accuracy
-                    }
+            if row.longitude is not None:
+                result["location"] = {
+                    "latitude": float(row.latitude),
+                    "longitude": float(row.longitude),
+                    "accuracy": row.location_accuracy
+                }
             
             return result
             
@@ -470,7 +891,7 @@ class SubmissionService:
                 "file_size": media_file.file_size,
                 "question_name": media_file.question_name,
                 "upload_status": media_file.upload_status,
-                "created_at": media_file.created_at.isoformat()
+                "created_at": media_file.created_at
             }
             
         except Exception as e:
@@ -0,0 +1,23 @@
+"""
+Identifier helpers
+Time-ordered UUIDs for insert-heavy tables
+"""
+
+import os
+import time
+import uuid
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a UUID version 7 (RFC 9562)
+    
+    The leading 48 bits hold the Unix time in milliseconds, so new IDs sort
+    after older ones and land on the right-hand edge of the primary key
+    index instead of on random B-tree pages.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
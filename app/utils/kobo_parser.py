@@ -3,51 +3,322 @@ Kobo Toolbox form parser utility
 Converts Kobo form structures into mobile-friendly format
 """
 
-import json
-from typing import Dict, List, Any, Optional
+import re
+import threading
+from collections import Counter, defaultdict
+from types import MappingProxyType
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Any, Optional
+
+try:
+    import ijson
+except ImportError:  # Streaming parse unavailable; parse_form_content still works
+    ijson = None
+
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    
+    _loads = orjson.loads
+except ImportError:  # Fall back to the slower stdlib encoder
+    import json
+    
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+    
+    _loads = json.loads
+
+# Per form revision, keyed on (form_id, modified_at). A form revision is
+# parsed once but its submissions are checked one at a time, so whatever is
+# derived from the form is kept rather than rebuilt per submission.
+_QUESTIONS_MAP_CACHE: Dict[tuple, Dict[str, Dict]] = {}
+_VALIDATOR_CACHE: Dict[tuple, Callable[[Dict], Dict[str, List[str]]]] = {}
+_PARSED_FORM_CACHE: Dict[tuple, Dict[str, Any]] = {}
+_FORM_CACHE_SIZE = 128
+# Threadpool routes share these caches; lookups and evictions take the lock,
+# building a value does not (two threads may build it, one copy is kept)
+_FORM_CACHE_LOCK = threading.Lock()
+
+# Kobo question type -> mobile app question type; anything else maps to 'text'
+_TYPE_MAP = MappingProxyType({
+    'text': 'text',
+    'integer': 'number',
+    'decimal': 'decimal',
+    'date': 'date',
+    'datetime': 'datetime',
+    'time': 'time',
+    'select_one': 'single_choice',
+    'select_multiple': 'multiple_choice',
+    'geopoint': 'location',
+    'geotrace': 'line',
+    'geoshape': 'area',
+    'image': 'photo',
+    'audio': 'audio',
+    'video': 'video',
+    'file': 'file',
+    'barcode': 'barcode',
+    'calculate': 'calculated',
+    'acknowledge': 'acknowledge',
+    'range': 'range'
+})
+
+# Survey rows that are not questions (groups and notes can be enhanced later)
+_SKIP_TYPES = frozenset(('begin_group', 'end_group', 'note', 'start', 'end'))
+
+# Kobo geopoint answer: "lat lon [altitude [accuracy]]", space separated.
+# Anything after the fourth number is ignored.
+_FLOAT = r'([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)(?!\S)'
+_GEOPOINT_RE = re.compile(rf'\s*{_FLOAT}\s+{_FLOAT}(?:\s+{_FLOAT})?(?:\s+{_FLOAT})?')
+
+# App question types that carry a media attachment
+_MEDIA_TYPES = frozenset(('photo', 'audio', 'video'))
+
+# Submission keys added by Kobo/ODK rather than answered by the user
+_SYSTEM_PREFIXES = ('_', 'meta/')
+
+# Language keys tried, in order, for translated labels and hints
+_LANG_KEYS = ('English', 'english', 'default')
+
+# Containers collected whole by the streaming parser's first pass
+_STREAMED_CONTAINERS = frozenset(('content.settings', 'content.choices.item', 'permissions'))
+
+
+def _extract_localized(item: Any, key: str) -> str:
+    """
+    Text of item[key], which Kobo gives either as a plain string or as a
+    {language: text} dict for translated forms (English first, then default,
+    then whichever language comes first). A non-dict item is used as-is.
+    """
+    value = item.get(key) if item.__class__ is dict else item
+    if not value:
+        return ''
+    if value.__class__ is dict:
+        for lang in _LANG_KEYS:
+            text = value.get(lang)
+            if text:
+                return text
+        return next(iter(value.values()), '')
+    return value if value.__class__ is str else str(value)
+
+
+def _per_form_revision(
+    cache: Dict[tuple, Any],
+    form_structure: Dict,
+    build: Callable[[Dict], Any],
+    id_key: str = 'form_id',
+    modified_key: str = 'modified_at'
+) -> Any:
+    """
+    build(form_structure), memoized per form revision in a bounded cache
+    
+    The revision is (form_structure[id_key], form_structure[modified_key]);
+    the defaults fit parsed forms, raw Kobo assets use uid/date_modified.
+    Forms missing either value cannot tell revisions apart and are never
+    memoized.
+    """
+    form_id = form_structure.get(id_key)
+    modified = form_structure.get(modified_key)
+    if not form_id or not modified:
+        return build(form_structure)
+    
+    key = (form_id, modified)
+    with _FORM_CACHE_LOCK:
+        value = cache.get(key)
+    if value is not None:
+        return value
+    
+    value = build(form_structure)
+    with _FORM_CACHE_LOCK:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        if len(cache) >= _FORM_CACHE_SIZE:
+            # Drop the oldest entry (dicts keep insertion order)
+            del cache[next(iter(cache))]
+        cache[key] = value
+    return value
+
+
+def _is_choice(value: Any, valid_choices: frozenset) -> bool:
+    """Set membership that treats unhashable answers (lists, dicts) as invalid"""
+    try:
+        return value in valid_choices
+    except TypeError:
+        return False
+
+
+def _conversion_check(convert: Callable[[Any], Any], message: str) -> Callable[[Any], Optional[List[str]]]:
+    """Check that a value converts with int()/float()"""
+    def check(value: Any) -> Optional[List[str]]:
+        try:
+            convert(value)
+        except (ValueError, TypeError):
+            return [message]
+        return None
+    return check
+
+
+def _single_choice_check(valid_choices: frozenset, message: str) -> Callable[[Any], Optional[List[str]]]:
+    """Check that a value is one of the form's choices"""
+    def check(value: Any) -> Optional[List[str]]:
+        return None if _is_choice(value, valid_choices) else [message]
+    return check
+
+
+def _multiple_choice_check(valid_choices: frozenset, label: str) -> Callable[[Any], Optional[List[str]]]:
+    """Check that every selected value is one of the form's choices"""
+    def check(value: Any) -> Optional[List[str]]:
+        selected_values = value if value.__class__ is list else [value]
+        return [
+            f"Invalid choice '{selected}' for {label}"
+            for selected in selected_values
+            if not _is_choice(selected, valid_choices)
+        ]
+    return check
+
+
+def _to_int(value: Any) -> Any:
+    """Whole-number answer; Kobo sends these as strings"""
+    value_type = value.__class__
+    return int(value) if value_type is str or value_type is float else value
+
+
+def _to_float(value: Any) -> Any:
+    """Decimal answer"""
+    # isinstance on purpose: bool is an int subclass and converts too
+    return float(value) if isinstance(value, (str, int)) else value
+
+
+def _to_choices(value: Any) -> Any:
+    """Space-separated multiple choice answer as a list"""
+    # JSON decoding gives exact str/list instances
+    value_type = value.__class__
+    if value_type is str:
+        return value.split()
+    return value if value_type is list else [value]
+
+
+def _to_geopoint(value: Any) -> Any:
+    """GPS answer ("lat lon [alt [accuracy]]") as a location dict"""
+    if value.__class__ is str:
+        match = _GEOPOINT_RE.match(value)
+        if match:
+            latitude, longitude, altitude, accuracy = match.groups()
+            return {
+                'latitude': float(latitude),
+                'longitude': float(longitude),
+                'altitude': float(altitude) if altitude else None,
+                'accuracy': float(accuracy) if accuracy else None
+            }
+    return value
+
+
+# App question type -> answer converter; everything else (including date and
+# datetime, kept as strings for now) goes through str()
+_FIELD_HANDLERS = MappingProxyType({
+    'number': _to_int,
+    'decimal': _to_float,
+    'multiple_choice': _to_choices,
+    'location': _to_geopoint,
+    'date': str,
+    'datetime': str
+})
+
+
+def _parse_question(item: Dict, choices_map: Dict) -> Optional[Dict]:
+    """Parse individual question from Kobo survey"""
+    question_type = item.get('type', '')
+    
+    # Skip groups and notes for now (can be enhanced later)
+    if question_type in _SKIP_TYPES:
+        return None
+    
+    question = {
+        'name': item.get('name', ''),
+        'label': _extract_localized(item, 'label'),
+        'type': _TYPE_MAP.get(question_type, 'text'),
+        'required': item.get('required', False),
+        'hint': _extract_localized(item, 'hint'),
+        'constraint': item.get('constraint'),
+        'constraint_message': _extract_localized(item.get('constraint_message', {}), 'label'),
+        'relevant': item.get('relevant'),
+        'default': item.get('default'),
+        'readonly': item.get('readonly', False),
+        'appearance': item.get('appearance', '')
+    }
+    
+    # Add choices for select questions
+    if question_type.startswith('select_'):
+        choices = choices_map.get(item.get('select_from_list_name', ''))
+        if choices is not None:
+            question['choices'] = choices
+            question['allow_other'] = 'other' in item.get('appearance', '')
+    
+    # Add specific attributes for different question types
+    if question_type == 'integer':
+        question['min_value'] = item.get('constraint', {}).get('min')
+        question['max_value'] = item.get('constraint', {}).get('max')
+    elif question_type == 'decimal':
+        question['decimal_places'] = item.get('bind', {}).get('jr:constraintMsg', {}).get('decimal_places')
+    elif question_type == 'text':
+        question['max_length'] = item.get('bind', {}).get('jr:constraintMsg', {}).get('max_length')
+    elif question_type == 'geopoint':
+        question['accuracy_threshold'] = item.get('bind', {}).get('jr:preload', {}).get('accuracy')
+    
+    return question
 
 
 class KoboFormParser:
     """Parser for Kobo form structures"""
     
+    # JSON decoding for raw Kobo payloads (orjson when installed)
+    loads = staticmethod(_loads)
+    
     @staticmethod
     def parse_form_content(form_data: Dict) -> Dict[str, Any]:
         """
         Parse Kobo form structure into mobile-friendly format
         
+        Results are cached per (uid, date_modified), so a form is parsed once
+        per revision; the returned dict is shared and must not be modified.
+        
         Args:
             form_data: Raw form data from Kobo API
             
         Returns:
             Simplified form structure for mobile app consumption
         """
+        return _per_form_revision(
+            _PARSED_FORM_CACHE,
+            form_data,
+            KoboFormParser._parse_form_content,
+            id_key='uid',
+            modified_key='date_modified'
+        )
+    
+    @staticmethod
+    def _parse_form_content(form_data: Dict) -> Dict[str, Any]:
+        """Uncached parse_form_content"""
         try:
             content = form_data.get('content', {})
             survey = content.get('survey', [])
             choices = content.get('choices', [])
             
             # Build choices lookup for select questions
-            choices_map = {}
-            for choice in choices:
-                list_name = choice.get('list_name', '')
-                if list_name not in choices_map:
-                    choices_map[list_name] = []
-                choices_map[list_name].append({
-                    'name': choice.get('name', ''),
-                    'label': KoboFormParser._get_label(choice)
-                })
+            choices_map = KoboFormParser._build_choices_map(choices)
             
             # Parse survey questions
-            questions = []
-            for item in survey:
-                question = KoboFormParser._parse_question(item, choices_map)
-                if question:
-                    questions.append(question)
+            parse_question = _parse_question
+            questions = [
+                question for item in survey
+                if (question := parse_question(item, choices_map)) is not None
+            ]
             
             return {
                 'form_id': form_data.get('uid', ''),
                 'form_name': form_data.get('name', ''),
-                'form_title': KoboFormParser._get_label(content.get('settings', {})),
+                'form_title': _extract_localized(content.get('settings', {}), 'label'),
                 'questions': questions,
                 'submission_url': f"/api/v1/submissions/",
                 'created_at': form_data.get('date_created'),
@@ -61,103 +332,112 @@ class KoboFormParser:
             raise ValueError(f"Error parsing form: {e}")
     
     @staticmethod
-    def _parse_question(item: Dict, choices_map: Dict) -> Optional[Dict]:
-        """Parse individual question from Kobo survey"""
-        question_type = item.get('type', '')
+    def parse_form_content_stream(fp: BinaryIO) -> Dict[str, Any]:
+        """
+        Parse a Kobo form JSON file without loading the raw document
         
-        # Skip groups and notes for now (can be enhanced later)
-        if question_type in ['begin_group', 'end_group', 'note', 'start', 'end']:
-            return None
+        Args:
+            fp: Seekable binary file holding the form data from the Kobo API
+            
+        Returns:
+            Same structure as parse_form_content
+        """
+        try:
+            header, settings, choices_map = KoboFormParser._stream_form_header(fp)
+            questions = list(KoboFormParser._stream_questions(fp, choices_map))
+            
+            return {
+                'form_id': header.get('uid', ''),
+                'form_name': header.get('name', ''),
+                'form_title': _extract_localized(settings, 'label'),
+                'questions': questions,
+                'submission_url': f"/api/v1/submissions/",
+                'created_at': header.get('date_created'),
+                'modified_at': header.get('date_modified'),
+                'deployment_status': header.get('deployment__active', False),
+                'owner': header.get('owner__username', ''),
+                'permissions': header.get('permissions', [])
+            }
+            
+        except Exception as e:
+            raise ValueError(f"Error parsing form: {e}")
+    
+    @staticmethod
+    def iter_form_questions(fp: BinaryIO) -> Iterator[Dict]:
+        """Yield parsed questions from a Kobo form JSON file one at a time"""
+        _, _, choices_map = KoboFormParser._stream_form_header(fp)
+        yield from KoboFormParser._stream_questions(fp, choices_map)
+    
+    @staticmethod
+    def iter_parsed_questions(survey: Iterable[Dict], choices_map: Dict) -> Iterator[Dict]:
+        """Parse survey items lazily, skipping groups, notes and other non-questions"""
+        parse_question = _parse_question
+        for item in survey:
+            question = parse_question(item, choices_map)
+            if question is not None:
+                yield question
+    
+    @staticmethod
+    def _stream_form_header(fp: BinaryIO) -> tuple:
+        """
+        First pass over a form file: top-level fields, settings and choices
         
-        question = {
-            'name': item.get('name', ''),
-            'label': KoboFormParser._get_label(item),
-            'type': KoboFormParser._map_question_type(question_type),
-            'required': item.get('required', False),
-            'hint': KoboFormParser._get_hint(item),
-            'constraint': item.get('constraint'),
-            'constraint_message': KoboFormParser._get_label(item.get('constraint_message', {})),
-            'relevant': item.get('relevant'),
-            'default': item.get('default'),
-            'readonly': item.get('readonly', False),
-            'appearance': item.get('appearance', '')
-        }
+        Survey items are skipped here; Kobo writes them before the choices
+        they refer to, so they are read in a second pass.
+        """
+        if ijson is None:
+            raise RuntimeError("ijson is required for streaming form parsing")
         
-        # Add choices for select questions
-        if question_type.startswith('select_'):
-            choice_list = item.get('select_from_list_name', '')
-            if choice_list in choices_map:
-                question['choices'] = choices_map[choice_list]
-                question['allow_other'] = 'other' in item.get('appearance', '')
+        fp.seek(0)
+        header = {}
+        settings = {}
+        choices = []
+        builder = None
+        built_prefix = None
         
-        # Add specific attributes for different question types
-        if question_type == 'integer':
-            question['min_value'] = item.get('constraint', {}).get('min')
-            question['max_value'] = item.get('constraint', {}).get('max')
-        elif question_type == 'decimal':
-            question['decimal_places'] = item.get('bind', {}).get('jr:constraintMsg', {}).get('decimal_places')
-        elif question_type == 'text':
-            question['max_length'] = item.get('bind', {}).get('jr:constraintMsg', {}).get('max_length')
-        elif question_type == 'geopoint':
-            question['accuracy_threshold'] = item.get('bind', {}).get('jr:preload', {}).get('accuracy')
+        for prefix, event, value in ijson.parse(fp, use_float=True):
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == built_prefix and event in ('end_map', 'end_array'):
+                    if built_prefix == 'content.choices.item':
+                        choices.append(builder.value)
+                    elif built_prefix == 'content.settings':
+                        settings = builder.value
+                    else:
+                        header[built_prefix] = builder.value
+                    builder = None
+            elif event in ('start_map', 'start_array') and prefix in _STREAMED_CONTAINERS:
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+                built_prefix = prefix
+            elif event not in ('map_key', 'start_map', 'start_array', 'end_map', 'end_array') and '.' not in prefix:
+                # Top-level scalar such as uid, name or date_modified
+                header[prefix] = value
         
-        return question
+        return header, settings, KoboFormParser._build_choices_map(choices)
     
     @staticmethod
-    def _map_question_type(kobo_type: str) -> str:
-        """Map Kobo question types to mobile app types"""
-        type_mapping = {
-            'text': 'text',
-            'integer': 'number',
-            'decimal': 'decimal',
-            'date': 'date',
-            'datetime': 'datetime',
-            'time': 'time',
-            'select_one': 'single_choice',
-            'select_multiple': 'multiple_choice',
-            'geopoint': 'location',
-            'geotrace': 'line',
-            'geoshape': 'area',
-            'image': 'photo',
-            'audio': 'audio',
-            'video': 'video',
-            'file': 'file',
-            'barcode': 'barcode',
-            'calculate': 'calculated',
-            'acknowledge': 'acknowledge',
-            'range': 'range'
-        }
-        return type_mapping.get(kobo_type, 'text')
+    def _stream_questions(fp: BinaryIO, choices_map: Dict) -> Iterator[Dict]:
+        """Second pass over a form file: parse survey items as they are read"""
+        fp.seek(0)
+        yield from KoboFormParser.iter_parsed_questions(
+            ijson.items(fp, 'content.survey.item', use_float=True), choices_map
+        )
     
     @staticmethod
-    def _get_label(item: Dict) -> str:
-        """Extract label from Kobo item (handles multiple languages)"""
-        if not item:
-            return ''
-            
-        label = item.get('label', '') if isinstance(item, dict) else item
-        
-        if isinstance(label, dict):
-            # Multiple languages - get English first, then default, then first available
-            return (label.get('English') or 
-                   label.get('english') or 
-                   label.get('default') or 
-                   list(label.values())[0] if label else '')
-        return str(label) if label else ''
-    
-    @staticmethod
-    def _get_hint(item: Dict) -> str:
-        """Extract hint/help text from Kobo item"""
-        hint = item.get('hint', '')
-        if isinstance(hint, dict):
-            return (hint.get('English') or 
-                   hint.get('english') or 
-                   hint.get('default') or 
-                   list(hint.values())[0] if hint else '')
-        return str(hint) if hint else ''
+    def _build_choices_map(choices: Iterable[Dict]) -> Dict[str, List[Dict]]:
+        """Group choice options by list_name for select questions"""
+        choices_map = defaultdict(list)
+        for choice in choices:
+            choices_map[choice.get('list_name', '')].append({
+                'name': choice.get('name', ''),
+                'label': _extract_localized(choice, 'label')
+            })
+        # Plain dict, so lookups of unknown lists never add empty entries
+        return dict(choices_map)
     
     @staticmethod
-    def parse_submission_data(submission_data: Dict, form_structure: Dict) -> Dict[str, Any]:
+    def parse_submission_data(submission_data: Dict[str, Any], form_structure: Dict[str, Any]) -> Dict[str, Any]:
         """
         Parse submission data according to form structure
         
@@ -168,61 +448,46 @@ class KoboFormParser:
         Returns:
             Cleaned and validated submission data
         """
-        parsed_data = {}
-        questions_map = {q['name']: q for q in form_structure.get('questions', [])}
+        parsed_data: Dict[str, Any] = {}
+        questions_map: Dict[str, Dict[str, Any]] = KoboFormParser._questions_map(form_structure)
+        
+        get_question = questions_map.get
+        parse_value = KoboFormParser._parse_field_value
         
         for field_name, field_value in submission_data.items():
             # Skip system fields
-            if field_name.startswith('_') or field_name.startswith('meta/'):
+            if field_name.startswith(_SYSTEM_PREFIXES):
                 continue
             
-            question = questions_map.get(field_name)
+            question = get_question(field_name)
             if not question:
                 # Include unknown fields as-is
                 parsed_data[field_name] = field_value
                 continue
             
             # Parse based on question type
-            question_type = question.get('type', 'text')
-            parsed_data[field_name] = KoboFormParser._parse_field_value(
-                field_value, question_type, question
-            )
+            question_type: str = question.get('type', 'text')
+            parsed_data[field_name] = parse_value(field_value, question_type, question)
         
         return parsed_data
     
     @staticmethod
-    def _parse_field_value(value: Any, question_type: str, question: Dict) -> Any:
+    def _questions_map(form_structure: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Name -> question index for a parsed form, cached per form revision"""
+        return _per_form_revision(
+            _QUESTIONS_MAP_CACHE,
+            form_structure,
+            lambda form: {q['name']: q for q in form.get('questions', [])}
+        )
+    
+    @staticmethod
+    def _parse_field_value(value: Any, question_type: str, question: Dict[str, Any]) -> Any:
         """Parse individual field value based on question type"""
         if value is None or value == '':
             return None
         
         try:
-            if question_type == 'number':
-                return int(value) if isinstance(value, (str, float)) else value
-            elif question_type == 'decimal':
-                return float(value) if isinstance(value, (str, int)) else value
-            elif question_type == 'multiple_choice':
-                # Handle space-separated multiple choice values
-                if isinstance(value, str):
-                    return [v.strip() for v in value.split() if v.strip()]
-                return value if isinstance(value, list) else [value]
-            elif question_type == 'location':
-                # Parse GPS coordinates
-                if isinstance(value, str):
-                    coords = value.split()
-                    if len(coords) >= 2:
-                        return {
-                            'latitude': float(coords[0]),
-                            'longitude': float(coords[1]),
-                            'altitude': float(coords[2]) if len(coords) > 2 else None,
-                            'accuracy': float(coords[3]) if len(coords) > 3 else None
-                        }
-                return value
-            elif question_type in ['date', 'datetime']:
-                # Keep date/datetime as string for now
-                return str(value)
-            else:
-                return str(value)
+            return _FIELD_HANDLERS.get(question_type, str)(value)
         except (ValueError, TypeError, IndexError):
             # If parsing fails, return original value
             return value
@@ -239,51 +504,73 @@ class KoboFormParser:
         Returns:
             Dictionary of field names with validation errors
         """
-        errors = {}
-        questions_map = {q['name']: q for q in form_structure.get('questions', [])}
+        validate = _per_form_revision(
+            _VALIDATOR_CACHE, form_structure, KoboFormParser.compile_validator
+        )
+        return validate(submission_data)
+    
+    @staticmethod
+    def compile_validator(form_structure: Dict) -> Callable[[Dict], Dict[str, List[str]]]:
+        """
+        Build a validator for submissions to one form
+        
+        Messages and valid choice sets are worked out once here, so checking
+        each submission is a walk over prepared (name, message, check) rows.
         
+        Args:
+            form_structure: Form structure for validation
+            
+        Returns:
+            Function taking submission data and returning the same errors
+            dictionary as validate_submission_data
+        """
+        rules = []
+        # Questions on the same choice list (yes/no, species...) share one
+        # list object in a parsed form, and so share one set of valid names
+        valid_choice_sets = {}
         for question in form_structure.get('questions', []):
             field_name = question['name']
-            field_value = submission_data.get(field_name)
-            field_errors = []
+            label = question.get('label', field_name)
+            question_type = question.get('type', 'text')
             
-            # Check required fields
-            if question.get('required', False) and (field_value is None or field_value == ''):
-                field_errors.append(f"{question.get('label', field_name)} is required")
+            required_message = f"{label} is required" if question.get('required', False) else None
             
-            # Type-specific validation
-            if field_value is not None and field_value != '':
-                question_type = question.get('type', 'text')
-                
-                if question_type == 'number':
-                    try:
-                        int(field_value)
-                    except (ValueError, TypeError):
-                        field_errors.append(f"{question.get('label', field_name)} must be a number")
-                
-                elif question_type == 'decimal':
-                    try:
-                        float(field_value)
-                    except (ValueError, TypeError):
-                        field_errors.append(f"{question.get('label', field_name)} must be a decimal number")
-                
-                elif question_type in ['single_choice', 'multiple_choice']:
-                    choices = question.get('choices', [])
-                    valid_choices = [choice['name'] for choice in choices]
-                    
-                    if question_type == 'single_choice':
-                        if field_value not in valid_choices:
-                            field_errors.append(f"Invalid choice for {question.get('label', field_name)}")
-                    else:  # multiple_choice
-                        selected_values = field_value if isinstance(field_value, list) else [field_value]
-                        for selected in selected_values:
-                            if selected not in valid_choices:
-                                field_errors.append(f"Invalid choice '{selected}' for {question.get('label', field_name)}")
+            check = None
+            if question_type == 'number':
+                check = _conversion_check(int, f"{label} must be a number")
+            elif question_type == 'decimal':
+                check = _conversion_check(float, f"{label} must be a decimal number")
+            elif question_type in ('single_choice', 'multiple_choice'):
+                choices = question.get('choices', [])
+                valid_choices = valid_choice_sets.get(id(choices))
+                if valid_choices is None:
+                    valid_choices = frozenset(choice['name'] for choice in choices)
+                    valid_choice_sets[id(choices)] = valid_choices
+                if question_type == 'single_choice':
+                    check = _single_choice_check(valid_choices, f"Invalid choice for {label}")
+                else:
+                    check = _multiple_choice_check(valid_choices, label)
             
-            if field_errors:
-                errors[field_name] = field_errors
+            if required_message or check:
+                rules.append((field_name, required_message, check))
+        
+        rules = tuple(rules)
+        
+        def validate(submission_data: Dict) -> Dict[str, List[str]]:
+            errors = {}
+            get = submission_data.get
+            for field_name, required_message, check in rules:
+                field_value = get(field_name)
+                if field_value is None or field_value == '':
+                    if required_message:
+                        errors[field_name] = [required_message]
+                elif check:
+                    field_errors = check(field_value)
+                    if field_errors:
+                        errors[field_name] = field_errors
+            return errors
         
-        return errors
+        return validate
     
     @staticmethod
     def get_form_summary(form_structure: Dict) -> Dict[str, Any]:
@@ -298,19 +585,23 @@ class KoboFormParser:
         """
         questions = form_structure.get('questions', [])
         
-        question_types = {}
+        # One pass over the questions, large forms have thousands of them
+        question_types = Counter()
         required_count = 0
         choice_questions = 0
-        
+        has_location = False
+        has_media = False
         for question in questions:
             q_type = question.get('type', 'text')
-            question_types[q_type] = question_types.get(q_type, 0) + 1
-            
+            question_types[q_type] += 1
             if question.get('required', False):
                 required_count += 1
-            
-            if q_type in ['single_choice', 'multiple_choice']:
+            if q_type == 'single_choice' or q_type == 'multiple_choice':
                 choice_questions += 1
+            elif q_type == 'location':
+                has_location = True
+            elif q_type in _MEDIA_TYPES:
+                has_media = True
         
         return {
             'form_id': form_structure.get('form_id', ''),
@@ -319,9 +610,9 @@ class KoboFormParser:
             'required_questions': required_count,
             'optional_questions': len(questions) - required_count,
             'choice_questions': choice_questions,
-            'question_types': question_types,
-            'has_location': 'location' in question_types,
-            'has_media': any(t in question_types for t in ['photo', 'audio', 'video']),
+            'question_types': dict(question_types),
+            'has_location': has_location,
+            'has_media': has_media,
             'deployment_status': form_structure.get('deployment_status', False),
             'created_at': form_structure.get('created_at'),
             'modified_at': form_structure.get('modified_at')
@@ -419,12 +710,12 @@ def test_form_parsing():
     parsed_form = parser.parse_form_content(sample_kobo_form)
     
     print("Parsed Form Structure:")
-    print(json.dumps(parsed_form, indent=2))
+    print(_dumps(parsed_form))
     
     # Test form summary
     summary = parser.get_form_summary(parsed_form)
     print("\nForm Summary:")
-    print(json.dumps(summary, indent=2))
+    print(_dumps(summary))
 
 
 if __name__ == "__main__":
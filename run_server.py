@@ -4,22 +4,35 @@ Wildlife Conservation API Server Launcher
 Simple script to start the FastAPI server
 """
 
+import sys
+
 import uvicorn
-from app.config import settings
+from app.config import settings, is_production
 
 if __name__ == "__main__":
-    print("🦁 Starting Wildlife Conservation API Server...")
-    print(f"Environment: {settings.environment}")
-    print(f"Host: {settings.host}:{settings.port}")
-    print(f"Debug: {settings.debug}")
-    print(f"Documentation: http://{settings.host}:{settings.port}/docs")
-    print("=" * 50)
+    # One write for the whole banner; production log pipelines don't need it
+    if not is_production():
+        sys.stdout.write(
+            "🦁 Starting Wildlife Conservation API Server...\n"
+            f"Environment: {settings.environment}\n"
+            f"Host: {settings.host}:{settings.port}\n"
+            f"Debug: {settings.debug}\n"
+            f"Documentation: http://{settings.host}:{settings.port}/docs\n"
+            f"{'=' * 50}\n"
+        )
+        sys.stdout.flush()
     
     uvicorn.run(
         "app.main:app",
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        # Reload needs a single process; see Settings.workers before raising it
+        workers=1 if settings.debug else max(settings.workers, 1),
+        # uvloop is not available on Windows (uvicorn[standard] skips it there)
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level=settings.log_level.lower(),
-        access_log=True,
+        # Per-request access logging is measurable under load; keep it out of production
+        access_log=not is_production(),
     )
@@ -2,6 +2,8 @@
 """
 Database migration script to create form submission tables
 Run this script to set up the submission system tables
+
+Pass --online to build indexes with CREATE INDEX CONCURRENTLY on a live database
 """
 
 import sys
@@ -16,57 +18,126 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def create_submission_tables():
-    """Create all submission-related tables"""
+def _concurrently(ddl: str) -> str:
+    """Online variant of an index statement, which does not lock out writes"""
+    return ddl.replace(
+        "CREATE INDEX IF NOT EXISTS", "CREATE INDEX CONCURRENTLY IF NOT EXISTS"
+    ).replace(
+        "CREATE UNIQUE INDEX IF NOT EXISTS", "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS"
+    ).replace(
+        "DROP INDEX IF EXISTS", "DROP INDEX CONCURRENTLY IF EXISTS"
+    )
+
+def create_submission_tables(online: bool = False):
+    """
+    Create all submission-related tables
+    
+    With online=True indexes are built CONCURRENTLY, so re-running against a
+    busy production table does not block inserts while they build.
+    """
     try:
         # Create engine
         engine = create_engine(settings.database_url)
         
         logger.info("Creating submission tables...")
         
-        # Enable PostGIS extension if not already enabled
-        with engine.connect() as conn:
-            conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis;"))
-            conn.commit()
-            logger.info("PostGIS extension enabled")
-        
-        # Create all tables
-        Base.metadata.create_all(bind=engine)
-        logger.info("Successfully created all submission tables:")
-        
-        # List created tables
-        created_tables = [
-            "users",
-            "form_templates", 
-            "form_submissions",
-            "media_files",
-            "sync_logs"
+        # Columns and types changed after the first release; create_all() skips existing tables
+        schema_updates = [
+            "ALTER TABLE form_submissions ADD COLUMN IF NOT EXISTS payload_sha256 VARCHAR(64);",
+            # submission_data was created as JSON; JSONB is parsed once on write and can be GIN-indexed
+            """
+            DO $$
+            BEGIN
+                IF (SELECT data_type FROM information_schema.columns
+                    WHERE table_name = 'form_submissions' AND column_name = 'submission_data') = 'json' THEN
+                    ALTER TABLE form_submissions ALTER COLUMN submission_data TYPE JSONB USING submission_data::jsonb;
+                END IF;
+            END $$;
+            """
         ]
         
-        for table in created_tables:
-            logger.info(f"  ✅ {table}")
+        # Indexes for better performance
+        indexes = [
+            # The composite index also serves form_template_id-only lookups
+            "DROP INDEX IF EXISTS idx_submissions_form_id;",
+            "CREATE INDEX IF NOT EXISTS idx_submissions_form_id_sync_status ON form_submissions(form_template_id, sync_status);",
+            "CREATE INDEX IF NOT EXISTS idx_submissions_user_id ON form_submissions(user_id);",
+            "CREATE INDEX IF NOT EXISTS idx_submissions_sync_status ON form_submissions(sync_status);",
+            # Partial covering indexes for the sync queues: tiny, and index-only for "next N by age"
+            "CREATE INDEX IF NOT EXISTS idx_submissions_pending ON form_submissions(created_at) INCLUDE (id) WHERE sync_status = 'pending';",
+            "CREATE INDEX IF NOT EXISTS idx_submissions_failed ON form_submissions(created_at) INCLUDE (id) WHERE sync_status = 'failed';",
+            # The keyset (created_at, id) index also serves created_at-only scans
+            "DROP INDEX IF EXISTS idx_submissions_created_at;",
+            "CREATE INDEX IF NOT EXISTS idx_submissions_created_at_id ON form_submissions(created_at DESC, id DESC);",
+            "CREATE INDEX IF NOT EXISTS idx_submissions_submitted_at ON form_submissions(submitted_at);",
+            # Retries of one payload insert with ON CONFLICT against this index
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_form_submissions_payload_sha256 ON form_submissions(payload_sha256);",
+            # Containment (@>) lookups on form answers, e.g. submission_data @> '{"species": "gorilla"}'
+            "CREATE INDEX IF NOT EXISTS ix_submission_data_gin ON form_submissions USING GIN (submission_data jsonb_path_ops);",
+            # Points only, so SP-GiST replaces the default GiST index: smaller and faster for bbox lookups
+            "DROP INDEX IF EXISTS idx_form_submissions_location;",
+            "CREATE INDEX IF NOT EXISTS idx_submissions_location_spgist ON form_submissions USING SPGIST (location);",
+            "CREATE INDEX IF NOT EXISTS idx_media_files_submission_id ON media_files(submission_id);",
+            "CREATE INDEX IF NOT EXISTS idx_form_templates_kobo_id ON form_templates(kobo_form_id);",
+            "CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);",
+            "CREATE INDEX IF NOT EXISTS idx_sync_logs_created_at ON sync_logs(created_at);"
+        ]
         
-        # Create indexes for better performance
-        with engine.connect() as conn:
-            logger.info("Creating indexes...")
+        # One connection and one transaction; each batch of DDL goes to the
+        # server as a single multi-statement round trip
+        with engine.begin() as conn:
+            # Enable PostGIS extension if not already enabled
+            conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS postgis;")
+            logger.info("PostGIS extension enabled")
             
-            indexes = [
-                "CREATE INDEX IF NOT EXISTS idx_submissions_form_id ON form_submissions(form_template_id);",
-                "CREATE INDEX IF NOT EXISTS idx_submissions_user_id ON form_submissions(user_id);",
-                "CREATE INDEX IF NOT EXISTS idx_submissions_sync_status ON form_submissions(sync_status);",
-                "CREATE INDEX IF NOT EXISTS idx_submissions_created_at ON form_submissions(created_at);",
-                "CREATE INDEX IF NOT EXISTS idx_submissions_submitted_at ON form_submissions(submitted_at);",
-                "CREATE INDEX IF NOT EXISTS idx_media_files_submission_id ON media_files(submission_id);",
-                "CREATE INDEX IF NOT EXISTS idx_form_templates_kobo_id ON form_templates(kobo_form_id);",
-                "CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);",
-                "CREATE INDEX IF NOT EXISTS idx_sync_logs_created_at ON sync_logs(created_at);"
+            # Create all tables. One count query decides the path: skip when
+            # every table exists, create without per-table existence checks
+            # when none do, and fall back to create_all's own checks otherwise.
+            table_names = list(Base.metadata.tables)
+            existing_count = conn.execute(
+                text("""
+                SELECT count(*)
+                FROM information_schema.tables
+                WHERE table_schema = 'public' AND table_name = ANY(:table_names)
+                """),
+                {"table_names": table_names}
+            ).scalar_one()
+            
+            if existing_count == len(table_names):
+                logger.info("All submission tables already exist, skipping create_all")
+            else:
+                Base.metadata.create_all(bind=conn, checkfirst=existing_count > 0)
+            logger.info("Successfully created all submission tables:")
+            
+            # List created tables
+            created_tables = [
+                "users",
+                "form_templates", 
+                "form_submissions",
+                "media_files",
+                "sync_logs"
             ]
             
-            for index_sql in indexes:
-                conn.execute(text(index_sql))
-                logger.info(f"  ✅ Index created")
+            for table in created_tables:
+                logger.info(f"  ✅ {table}")
+            
+            conn.exec_driver_sql("\n".join(schema_updates))
             
-            conn.commit()
+            if not online:
+                logger.info("Creating indexes...")
+                conn.exec_driver_sql("\n".join(indexes))
+                logger.info(f"  ✅ {len(indexes)} index statements applied")
+        
+        if online:
+            # CONCURRENTLY cannot run inside a transaction block, so each
+            # statement runs on its own in autocommit mode. A failed build
+            # leaves an INVALID index that must be dropped before re-running.
+            logger.info("Creating indexes concurrently...")
+            with engine.connect() as conn:
+                conn.execution_options(isolation_level="AUTOCOMMIT")
+                for index_sql in indexes:
+                    conn.exec_driver_sql(_concurrently(index_sql))
+                    logger.info(f"  ✅ Index created")
         
         logger.info("Database migration completed successfully!")
         
@@ -80,17 +151,20 @@ def verify_tables():
         engine = create_engine(settings.database_url)
         
         with engine.connect() as conn:
-            # Check if tables exist
-            tables_query = """
-            SELECT table_name 
-            FROM information_schema.tables 
-            WHERE table_schema = 'public' 
-            AND table_name IN ('users', 'form_templates', 'form_submissions', 'media_files', 'sync_logs')
-            ORDER BY table_name;
+            # Existing tables and the PostGIS check in one round trip
+            verify_query = """
+            SELECT
+                COALESCE(
+                    (SELECT array_agg(table_name::text ORDER BY table_name)
+                     FROM information_schema.tables 
+                     WHERE table_schema = 'public' 
+                     AND table_name IN ('users', 'form_templates', 'form_submissions', 'media_files', 'sync_logs')),
+                    ARRAY[]::text[]
+                ) AS existing_tables,
+                EXISTS(SELECT 1 FROM pg_extension WHERE extname = 'postgis') AS postgis_enabled;
             """
             
-            result = conn.execute(text(tables_query))
-            existing_tables = [row[0] for row in result.fetchall()]
+            existing_tables, postgis_enabled = conn.execute(text(verify_query)).one()
             
             expected_tables = ['form_submissions', 'form_templates', 'media_files', 'sync_logs', 'users']
             
@@ -102,10 +176,6 @@ def verify_tables():
                     logger.error(f"  ❌ {table} - missing")
             
             # Check PostGIS
-            postgis_query = "SELECT EXISTS(SELECT 1 FROM pg_extension WHERE extname = 'postgis');"
-            result = conn.execute(text(postgis_query))
-            postgis_enabled = result.fetchone()[0]
-            
             if postgis_enabled:
                 logger.info("  ✅ PostGIS extension - enabled")
             else:
@@ -122,7 +192,7 @@ if __name__ == "__main__":
     print(f"Database: {settings.database_url.split('@')[1] if '@' in settings.database_url else 'local'}")
     
     try:
-        create_submission_tables()
+        create_submission_tables(online="--online" in sys.argv[1:])
         
         if verify_tables():
             print("\n✅ Migration completed successfully!")
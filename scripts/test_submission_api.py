@@ -4,9 +4,10 @@ Complete Test Script for Wildlife Conservation Form Submission API
 Run this after setting up the database to test all endpoints
 """
 
-import requests
-import json
-import base64
+import asyncio
+import os
+import httpx
+import orjson
 from datetime import datetime
 from typing import Dict, Any
 
@@ -14,20 +15,45 @@ from typing import Dict, Any
 BASE_URL = "http://localhost:8000"
 API_BASE = f"{BASE_URL}/api/v1"
 
-def create_test_image():
-    """Create a small test image as base64"""
-    # Simple 1x1 pixel PNG in base64
-    return "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChAGA6x8pNwAAAABJRU5ErkJggg=="
+# The connectivity probes give up quickly so an unreachable server is
+# reported at once
+CONNECT_TIMEOUT = 2
 
-def test_api_status():
+# Full response dumps are only printed with WCB_TEST_VERBOSE=1
+VERBOSE = os.getenv("WCB_TEST_VERBOSE") == "1"
+
+# orjson bodies need the content type set explicitly (json= would set it)
+_JSON_CONTENT = {"Content-Type": "application/json"}
+
+# Fields shared by every generated test submission
+_SUBMISSION_DEFAULTS = {"app_version": "1.0.0"}
+
+# Simple 1x1 pixel PNG in base64
+_TEST_IMAGE_B64 = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChAGA6x8pNwAAAABJRU5ErkJggg=="
+
+def _loads(response: httpx.Response) -> Any:
+    """Decode a JSON response body"""
+    return orjson.loads(response.content)
+
+def _pretty(obj: Any) -> str:
+    """Indented JSON for printing, or a placeholder when not verbose"""
+    if not VERBOSE:
+        return f"<{type(obj).__name__} elided>"
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str).decode()
+
+def _post_json(client: httpx.AsyncClient, url: str, data: Dict[str, Any]):
+    """POST data encoded with orjson; returns the request coroutine"""
+    return client.post(url, content=orjson.dumps(data), headers=_JSON_CONTENT)
+
+async def test_api_status(client: httpx.AsyncClient):
     """Test API status endpoint"""
     print("🧪 Testing API Status...")
     
     try:
-        response = requests.get(f"{API_BASE}/status")
+        response = await client.get(f"{API_BASE}/status", timeout=CONNECT_TIMEOUT)
         print(f"Status Code: {response.status_code}")
         if response.status_code == 200:
-            print(f"Response: {json.dumps(response.json(), indent=2)}")
+            print(f"Response: {_pretty(_loads(response))}")
             return True
         else:
             print(f"Error: {response.text}")
@@ -36,42 +62,42 @@ def test_api_status():
         print(f"API Status test failed: {e}")
         return False
 
-def test_health_check():
+async def test_health_check(client: httpx.AsyncClient):
     """Test health check endpoint"""
     print("\n🧪 Testing Health Check...")
     
     try:
-        response = requests.get(f"{BASE_URL}/health")
+        response = await client.get(f"{BASE_URL}/health", timeout=CONNECT_TIMEOUT)
         print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        print(f"Response: {_pretty(_loads(response))}")
         return response.status_code in [200, 503]  # Either healthy or degraded is ok
     except Exception as e:
         print(f"Health check test failed: {e}")
         return False
 
-def test_forms_api():
+async def test_forms_api(client: httpx.AsyncClient):
     """Test forms API (feeding frontend)"""
     print("\n🧪 Testing Forms API (Frontend Form Feeding)...")
     
     try:
         # Test get forms list
-        response = requests.get(f"{API_BASE}/forms/")
+        response = await client.get(f"{API_BASE}/forms/")
         print(f"Forms list - Status Code: {response.status_code}")
         
         if response.status_code == 200:
-            forms = response.json()
+            forms = _loads(response)
             print(f"Available forms: {forms.get('count', 0)}")
             if forms.get('results'):
                 first_form = forms['results'][0]
                 print(f"First form: {first_form.get('name', 'Unnamed')}")
                 return first_form.get('uid')
         else:
-            print(f"Forms API Error: {response.json()}")
+            print(f"Forms API Error: {_loads(response)}")
     except Exception as e:
         print(f"Forms API test failed: {e}")
     return None
 
-def test_form_detail(form_id):
+async def test_form_detail(client: httpx.AsyncClient, form_id):
     """Test individual form details"""
     if not form_id:
         print("\n⚠️ Skipping form detail test - no form ID")
@@ -80,20 +106,20 @@ def test_form_detail(form_id):
     print(f"\n🧪 Testing Form Details for {form_id}...")
     
     try:
-        response = requests.get(f"{API_BASE}/forms/{form_id}")
+        response = await client.get(f"{API_BASE}/forms/{form_id}")
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
-            form = response.json()
+            form = _loads(response)
             print(f"Form title: {form.get('name', 'Unnamed')}")
             survey_questions = form.get('content', {}).get('survey', [])
             print(f"Form has {len(survey_questions)} questions")
         else:
-            print(f"Form detail error: {response.json()}")
+            print(f"Form detail error: {_loads(response)}")
     except Exception as e:
         print(f"Form detail test failed: {e}")
 
-def test_create_submission():
+async def test_create_submission(client: httpx.AsyncClient):
     """Test creating a single form submission"""
     print("\n🧪 Testing Form Submission Creation...")
     
@@ -124,30 +150,30 @@ def test_create_submission():
                 "mime_type": "image/jpeg",
                 "file_size": 1024,
                 "question_name": "photo_evidence",
-                "file_data": create_test_image()
+                "file_data": _TEST_IMAGE_B64
             }
         ],
         "submitted_at": datetime.now().isoformat()
     }
     
     try:
-        response = requests.post(
+        response = await _post_json(
+            client,
             f"{API_BASE}/submissions/",
-            json=submission_data,
-            headers={"Content-Type": "application/json"}
+            submission_data
         )
         
         print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2, default=str)}")
+        print(f"Response: {_pretty(_loads(response))}")
         
         if response.status_code == 201:
-            return response.json()["id"]
+            return _loads(response)["id"]
     except Exception as e:
         print(f"Create submission test failed: {e}")
     
     return None
 
-def test_create_multiple_submissions():
+async def test_create_multiple_submissions(client: httpx.AsyncClient):
     """Test creating multiple submissions for better testing"""
     print("\n🧪 Testing Multiple Submissions Creation...")
     
@@ -193,70 +219,86 @@ def test_create_multiple_submissions():
         }
     ]
     
-    for i, submission_data in enumerate(test_submissions, 1):
-        submission_data["device_id"] = f"test_device_{i}"
-        submission_data["app_version"] = "1.0.0"
-        submission_data["submitted_at"] = datetime.now().isoformat()
-        
-        # Add a test image for the first submission
-        if i == 1:
-            submission_data["media_files"] = [
-                {
-                    "filename": f"wildlife_photo_{i}.jpg",
-                    "file_type": "image",
-                    "mime_type": "image/jpeg",
-                    "file_size": 1024 * i,
-                    "question_name": "evidence_photo",
-                    "file_data": create_test_image()
-                }
-            ]
-        
+    # Add a test image for the first submission
+    test_media_files = [
+        {
+            "filename": "wildlife_photo_1.jpg",
+            "file_type": "image",
+            "mime_type": "image/jpeg",
+            "file_size": 1024,
+            "question_name": "evidence_photo",
+            "file_data": _TEST_IMAGE_B64
+        }
+    ]
+    
+    # One timestamp is enough for the whole batch
+    now_iso = datetime.now().isoformat()
+    
+    # Encode every payload once before any request goes out
+    bodies = [
+        orjson.dumps({
+            **submission_data,
+            **_SUBMISSION_DEFAULTS,
+            "device_id": f"test_device_{i}",
+            "submitted_at": now_iso,
+            **({"media_files": test_media_files} if i == 1 else {})
+        })
+        for i, submission_data in enumerate(test_submissions, 1)
+    ]
+    
+    # The submissions are independent, so they are posted concurrently
+    responses = await asyncio.gather(
+        *(
+            client.post(f"{API_BASE}/submissions/", content=body, headers=_JSON_CONTENT)
+            for body in bodies
+        ),
+        return_exceptions=True
+    )
+    
+    for i, response in enumerate(responses, 1):
         try:
-            response = requests.post(
-                f"{API_BASE}/submissions/",
-                json=submission_data,
-                headers={"Content-Type": "application/json"}
-            )
+            if isinstance(response, Exception):
+                raise response
             
             if response.status_code == 201:
-                submission_id = response.json()["id"]
+                submission_id = _loads(response)["id"]
                 submission_ids.append(submission_id)
                 print(f"✅ Created submission {i}: {submission_id}")
             else:
-                print(f"❌ Failed to create submission {i}: {response.json()}")
+                print(f"❌ Failed to create submission {i}: {_loads(response)}")
         except Exception as e:
             print(f"❌ Error creating submission {i}: {e}")
     
     print(f"Created {len(submission_ids)} test submissions")
     return submission_ids
 
-def test_get_submissions():
+async def test_get_submissions(client: httpx.AsyncClient):
     """Get submissions list"""
     print("\n🧪 Testing Get Submissions...")
     
     try:
-        response = requests.get(f"{API_BASE}/submissions/")
+        response = await client.get(f"{API_BASE}/submissions/")
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
-            data = response.json()
+            data = _loads(response)
             print(f"Total submissions: {data['total']}")
             print(f"Page: {data['page']}")
             print(f"Submissions count: {len(data['submissions'])}")
             
             if data['submissions']:
                 print("First submission:")
-                print(json.dumps(data['submissions'][0], indent=2, default=str))
+                print(_pretty(data['submissions'][0]))
             
             return data['submissions']
         else:
-            print(f"Error: {response.json()}")
+            print(f"Error: {_loads(response)}")
     except Exception as e:
         print(f"Get submissions test failed: {e}")
     
     return []
 
-def test_get_submission_detail(submission_id):
+async def test_get_submission_detail(client: httpx.AsyncClient, submission_id):
     """Test getting submission details"""
     if not submission_id:
         print("\n⚠️ Skipping submission detail test - no submission ID")
@@ -265,32 +307,32 @@ def test_get_submission_detail(submission_id):
     print(f"\n🧪 Testing Get Submission Detail for {submission_id}...")
     
     try:
-        response = requests.get(f"{API_BASE}/submissions/{submission_id}")
+        response = await client.get(f"{API_BASE}/submissions/{submission_id}")
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
-            print(f"Response: {json.dumps(response.json(), indent=2, default=str)}")
+            print(f"Response: {_pretty(_loads(response))}")
         else:
-            print(f"Error: {response.json()}")
+            print(f"Error: {_loads(response)}")
     except Exception as e:
         print(f"Get submission detail test failed: {e}")
 
-def test_submission_stats():
+async def test_submission_stats(client: httpx.AsyncClient):
     """Test submission statistics"""
     print("\n🧪 Testing Submission Statistics...")
     
     try:
-        response = requests.get(f"{API_BASE}/submissions/stats/overview")
+        response = await client.get(f"{API_BASE}/submissions/stats/overview")
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
-            print(f"Stats: {json.dumps(response.json(), indent=2)}")
+            print(f"Stats: {_pretty(_loads(response))}")
         else:
-            print(f"Error: {response.json()}")
+            print(f"Error: {_loads(response)}")
     except Exception as e:
         print(f"Submission stats test failed: {e}")
 
-def test_sync_submissions():
+async def test_sync_submissions(client: httpx.AsyncClient):
     """Test manual sync with Kobo"""
     print("\n🧪 Testing Manual Sync...")
     
@@ -300,101 +342,107 @@ def test_sync_submissions():
     }
     
     try:
-        response = requests.post(
+        response = await _post_json(
+            client,
             f"{API_BASE}/submissions/sync",
-            json=sync_data,
-            headers={"Content-Type": "application/json"}
+            sync_data
         )
         
         print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2, default=str)}")
+        print(f"Response: {_pretty(_loads(response))}")
     except Exception as e:
         print(f"Sync submissions test failed: {e}")
 
-def test_filtered_submissions():
+async def test_filtered_submissions(client: httpx.AsyncClient):
     """Test submissions with filters"""
     print("\n🧪 Testing Filtered Submissions...")
     
     try:
-        # Test with sync status filter
-        response = requests.get(f"{API_BASE}/submissions/?sync_status=pending")
-        print(f"Pending submissions - Status Code: {response.status_code}")
+        # The probes are independent, so they are fired together
+        pending_response, page_response = await asyncio.gather(
+            # Test with sync status filter
+            client.get(f"{API_BASE}/submissions/?sync_status=pending"),
+            # Test with pagination
+            client.get(f"{API_BASE}/submissions/?page=1&per_page=5")
+        )
         
-        if response.status_code == 200:
-            data = response.json()
+        print(f"Pending submissions - Status Code: {pending_response.status_code}")
+        
+        if pending_response.status_code == 200:
+            data = _loads(pending_response)
             print(f"Pending submissions: {data['total']}")
         
-        # Test with pagination
-        response = requests.get(f"{API_BASE}/submissions/?page=1&per_page=5")
-        print(f"Paginated submissions - Status Code: {response.status_code}")
+        print(f"Paginated submissions - Status Code: {page_response.status_code}")
         
-        if response.status_code == 200:
-            data = response.json()
+        if page_response.status_code == 200:
+            data = _loads(page_response)
             print(f"Page 1 (5 per page): {len(data['submissions'])} submissions")
     except Exception as e:
         print(f"Filtered submissions test failed: {e}")
 
-def test_submission_filtering():
+async def test_submission_filtering(client: httpx.AsyncClient):
     """Test advanced submission filtering"""
     print("\n🧪 Testing Advanced Submission Filtering...")
     
     try:
-        # Test filter by username
-        response = requests.get(f"{API_BASE}/submissions/?username=researcher_jane")
-        print(f"Filter by username - Status Code: {response.status_code}")
-        if response.status_code == 200:
-            data = response.json()
+        # The probes are independent, so they are fired together
+        username_response, form_response, combined_response = await asyncio.gather(
+            # Test filter by username
+            client.get(f"{API_BASE}/submissions/?username=researcher_jane"),
+            # Test filter by form_id
+            client.get(f"{API_BASE}/submissions/?form_id=wildlife_survey_001"),
+            # Test combined filters
+            client.get(f"{API_BASE}/submissions/?sync_status=pending&per_page=10")
+        )
+        
+        print(f"Filter by username - Status Code: {username_response.status_code}")
+        if username_response.status_code == 200:
+            data = _loads(username_response)
             print(f"Jane's submissions: {data['total']}")
         
-        # Test filter by form_id
-        response = requests.get(f"{API_BASE}/submissions/?form_id=wildlife_survey_001")
-        print(f"Filter by form_id - Status Code: {response.status_code}")
-        if response.status_code == 200:
-            data = response.json()
+        print(f"Filter by form_id - Status Code: {form_response.status_code}")
+        if form_response.status_code == 200:
+            data = _loads(form_response)
             print(f"Wildlife survey submissions: {data['total']}")
         
-        # Test combined filters
-        response = requests.get(f"{API_BASE}/submissions/?sync_status=pending&per_page=10")
-        print(f"Combined filters - Status Code: {response.status_code}")
-        if response.status_code == 200:
-            data = response.json()
+        print(f"Combined filters - Status Code: {combined_response.status_code}")
+        if combined_response.status_code == 200:
+            data = _loads(combined_response)
             print(f"Pending submissions (max 10): {len(data['submissions'])}")
     except Exception as e:
         print(f"Advanced filtering test failed: {e}")
 
-def test_media_file_handling():
+async def test_media_file_handling(client: httpx.AsyncClient):
     """Test media file operations"""
     print("\n🧪 Testing Media File Handling...")
     
     try:
-        # First, get a submission with media files
-        response = requests.get(f"{API_BASE}/submissions/")
+        # First, get a submission with media files; the server filters them
+        response = await client.get(f"{API_BASE}/submissions/?has_media=true&per_page=1")
         if response.status_code == 200:
-            submissions = response.json()["submissions"]
+            submissions = _loads(response)["submissions"]
             
-            for submission in submissions:
-                # Get detailed submission to check for media files
-                detail_response = requests.get(f"{API_BASE}/submissions/{submission['id']}")
+            if submissions:
+                submission = submissions[0]
+                # Get detailed submission for its media files
+                detail_response = await client.get(f"{API_BASE}/submissions/{submission['id']}")
                 if detail_response.status_code == 200:
-                    detail = detail_response.json()
-                    if detail.get("media_files"):
-                        media_file = detail["media_files"][0]
-                        print(f"Found media file: {media_file['filename']}")
-                        
-                        # Test media download
-                        media_response = requests.get(
-                            f"{API_BASE}/submissions/{submission['id']}/media/{media_file['id']}"
-                        )
-                        print(f"Media download - Status Code: {media_response.status_code}")
-                        if media_response.status_code == 200:
-                            print(f"Media file downloaded successfully")
-                        break
+                    media_file = _loads(detail_response)["media_files"][0]
+                    print(f"Found media file: {media_file['filename']}")
+                    
+                    # Test media download
+                    media_response = await client.get(
+                        f"{API_BASE}/submissions/{submission['id']}/media/{media_file['id']}"
+                    )
+                    print(f"Media download - Status Code: {media_response.status_code}")
+                    if media_response.status_code == 200:
+                        print(f"Media file downloaded successfully")
             else:
                 print("No submissions with media files found")
     except Exception as e:
         print(f"Media file handling test failed: {e}")
 
-def test_error_handling():
+async def test_error_handling(client: httpx.AsyncClient):
     """Test API error handling"""
     print("\n🧪 Testing Error Handling...")
     
@@ -406,10 +454,10 @@ def test_error_handling():
             "submitted_at": "invalid_date"  # Invalid date should fail
         }
         
-        response = requests.post(
+        response = await _post_json(
+            client,
             f"{API_BASE}/submissions/",
-            json=invalid_submission,
-            headers={"Content-Type": "application/json"}
+            invalid_submission
         )
         print(f"Invalid submission - Status Code: {response.status_code}")
         if response.status_code == 400:
@@ -417,79 +465,89 @@ def test_error_handling():
         
         # Test non-existent submission
         fake_uuid = "00000000-0000-0000-0000-000000000000"
-        response = requests.get(f"{API_BASE}/submissions/{fake_uuid}")
+        response = await client.get(f"{API_BASE}/submissions/{fake_uuid}")
         print(f"Non-existent submission - Status Code: {response.status_code}")
         if response.status_code == 404:
             print("✅ Properly returned 404 for non-existent submission")
     except Exception as e:
         print(f"Error handling test failed: {e}")
 
-def run_comprehensive_tests():
+async def run_comprehensive_tests():
     """Run comprehensive API test suite"""
+    async with httpx.AsyncClient(
+        timeout=30,
+        # One keep-alive pool for every call; sized for the concurrent groups
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        headers={"Accept": "application/json"}
+    ) as client:
+        await _run_comprehensive_tests(client)
+
+async def _run_comprehensive_tests(client: httpx.AsyncClient):
+    """Run the test suite over one shared client (and its connection pool)"""
     print("🚀 Starting Comprehensive Form Submission API Tests")
     print("="*60)
     
     # Track test results
     results = {}
     
-    # Basic connectivity tests
+    # Basic connectivity tests: independent read-only probes, run
+    # concurrently (their output may interleave)
     print("\n📡 CONNECTIVITY TESTS")
     print("-" * 30)
-    results["api_status"] = test_api_status()
-    results["health_check"] = test_health_check()
+    results["api_status"], results["health_check"] = await asyncio.gather(
+        test_api_status(client),
+        test_health_check(client)
+    )
+    
+    # Every later request would fail the same way
+    if not (results["api_status"] or results["health_check"]):
+        print("\n❌ Server unreachable, skipping remaining tests")
+        _print_connection_help()
+        return
     
-    # Forms API tests (feeding frontend)
+    # Form feeding tests
     print("\n📋 FORM FEEDING TESTS")
     print("-" * 30)
-    form_id = test_forms_api()
-    test_form_detail(form_id)
+    form_id = await test_forms_api(client)
+    await test_form_detail(client, form_id)
     results["forms_api"] = form_id is not None
     
     # Submission creation tests
     print("\n📝 SUBMISSION CREATION TESTS")
     print("-" * 30)
-    submission_ids = test_create_multiple_submissions()
+    submission_ids = await test_create_multiple_submissions(client)
     results["create_submissions"] = len(submission_ids) > 0
     
     # Single submission test for backward compatibility
-    single_submission_id = test_create_submission()
+    single_submission_id = await test_create_submission(client)
     if single_submission_id:
         submission_ids.append(single_submission_id)
     
-    # Submission retrieval tests
-    print("\n📊 SUBMISSION RETRIEVAL TESTS")
-    print("-" * 30)
-    submissions = test_get_submissions()
-    results["get_submissions"] = len(submissions) >= 0
+    async def retrieval_tests():
+        submissions = await test_get_submissions(client)
+        if submission_ids:
+            await test_get_submission_detail(client, submission_ids[0])
+        return submissions
     
-    if submission_ids:
-        test_get_submission_detail(submission_ids[0])
-    
-    # Advanced filtering tests
-    print("\n🔍 FILTERING TESTS")
-    print("-" * 30)
-    test_submission_filtering()
-    test_filtered_submissions()
-    
-    # Statistics and monitoring
-    print("\n📈 STATISTICS TESTS")
+    # Retrieval, filtering, statistics, media and error handling only read
+    # data, so they run concurrently once the submissions exist (their
+    # output may interleave)
+    print("\n📊 SUBMISSION RETRIEVAL / 🔍 FILTERING / 📈 STATISTICS / 📸 MEDIA HANDLING / ⚠️ ERROR HANDLING TESTS")
     print("-" * 30)
-    test_submission_stats()
+    submissions, *_ = await asyncio.gather(
+        retrieval_tests(),
+        test_submission_filtering(client),
+        test_filtered_submissions(client),
+        test_submission_stats(client),
+        test_media_file_handling(client),
+        test_error_handling(client)
+    )
+    results["get_submissions"] = len(submissions) >= 0
     
-    # Sync operations
+    # Sync operations change submission state, so they run last
     print("\n🔄 SYNC TESTS")
     print("-" * 30)
-    test_sync_submissions()
-    
-    # Media handling
-    print("\n📸 MEDIA HANDLING TESTS")
-    print("-" * 30)
-    test_media_file_handling()
-    
-    # Error handling
-    print("\n⚠️ ERROR HANDLING TESTS")
-    print("-" * 30)
-    test_error_handling()
+    await test_sync_submissions(client)
     
     # Final summary
     print("\n" + "="*60)
@@ -523,20 +581,24 @@ def run_comprehensive_tests():
     print("6. 🌍 Test with real wildlife conservation data")
     print("7. 🚀 Deploy to production environment")
 
+def _print_connection_help():
+    """Explain how to get the server reachable"""
+    print("❌ Connection Error: Make sure your FastAPI server is running on http://localhost:8000")
+    print("Run: uvicorn app.main:app --reload")
+    print("\nAlso ensure you have:")
+    print("1. ✅ Updated your API router to include submissions")
+    print("2. ✅ Run database migration script")
+    print("3. ✅ Installed all dependencies")
+
 def run_all_tests():
     """Backward compatibility - calls comprehensive tests"""
-    return run_comprehensive_tests()
+    return asyncio.run(run_comprehensive_tests())
 
 if __name__ == "__main__":
     try:
-        run_comprehensive_tests()
-    except requests.exceptions.ConnectionError:
-        print("❌ Connection Error: Make sure your FastAPI server is running on http://localhost:8000")
-        print("Run: uvicorn app.main:app --reload")
-        print("\nAlso ensure you have:")
-        print("1. ✅ Updated your API router to include submissions")
-        print("2. ✅ Run database migration script")
-        print("3. ✅ Installed all dependencies")
+        asyncio.run(run_comprehensive_tests())
+    except httpx.ConnectError:
+        _print_connection_help()
     except Exception as e:
         print(f"❌ Test execution failed: {e}")
         import traceback
@@ -6,7 +6,7 @@ Run this script to test your FastAPI backend setup
 
 import asyncio
 import httpx
-import json
+import orjson
 from datetime import datetime
 from typing import Dict, Any
 
@@ -17,28 +17,42 @@ TEST_TIMEOUT = 30
 async def test_endpoint(client: httpx.AsyncClient, endpoint: str, method: str = "GET", data: dict = None) -> Dict[str, Any]:
     """Test a single API endpoint"""
     url = f"{BASE_URL}{endpoint}"
+    # Every outcome returns the same keys
+    result = {
+        "endpoint": endpoint,
+        "success": False,
+        "status_code": None,
+        "response_time": 0.0,
+        "response": None,
+        "error": None,
+    }
     
     try:
         print(f"🔍 Testing {method} {endpoint}...")
         
         if method == "GET":
             response = await client.get(url)
+        elif method == "HEAD":
+            response = await client.head(url)
         elif method == "POST":
-            response = await client.post(url, json=data)
+            response = await client.post(
+                url, content=orjson.dumps(data), headers={"Content-Type": "application/json"}
+            )
         else:
             raise ValueError(f"Unsupported method: {method}")
         
-        result = {
-            "endpoint": endpoint,
-            "status_code": response.status_code,
-            "success": 200 <= response.status_code < 300,
-            "response_time": response.elapsed.total_seconds(),
-        }
+        result["status_code"] = response.status_code
+        result["success"] = 200 <= response.status_code < 300
+        result["response_time"] = response.elapsed.total_seconds()
         
-        try:
-            result["response"] = response.json()
-        except:
-            result["response"] = response.text[:200] + "..." if len(response.text) > 200 else response.text
+        # HEAD responses have no body, the status code is the whole answer
+        if method != "HEAD":
+            try:
+                result["response"] = orjson.loads(response.content)
+            except orjson.JSONDecodeError:
+                # Only decode the text when the body is not JSON
+                text = response.text
+                result["response"] = text[:200] + "..." if len(text) > 200 else text
         
         if result["success"]:
             print(f"   ✅ {response.status_code} - OK")
@@ -50,65 +64,61 @@ async def test_endpoint(client: httpx.AsyncClient, endpoint: str, method: str =
         
     except Exception as e:
         print(f"   ❌ FAILED - {str(e)}")
-        return {
-            "endpoint": endpoint,
-            "success": False,
-            "error": str(e)
-        }
+        result["error"] = str(e)
+        return result
 
 async def main():
     """Main test function"""
     print("🦁 Wildlife Conservation Backend Test Suite")
     print("=" * 60)
     
-    test_results = []
-    
-    async with httpx.AsyncClient(timeout=TEST_TIMEOUT) as client:
-        # Test basic endpoints
-        basic_tests = [
-            "/",
-            "/health",
-            "/api/v1/health/",
-            "/api/v1/health/database",
-            "/api/v1/health/kobo",
-        ]
-        
-        print("\n📋 Testing Basic Endpoints...")
-        print("-" * 40)
-        
-        for endpoint in basic_tests:
-            result = await test_endpoint(client, endpoint)
-            test_results.append(result)
-        
-        # Test API endpoints
-        api_tests = [
-            "/api/v1/forms/",
-        ]
-        
-        print("\n📋 Testing API Endpoints...")
-        print("-" * 40)
-        
-        for endpoint in api_tests:
-            result = await test_endpoint(client, endpoint)
-            test_results.append(result)
-        
-        # Test API documentation
-        print("\n📋 Testing API Documentation...")
-        print("-" * 40)
-        
-        doc_result = await test_endpoint(client, "/docs")
-        test_results.append(doc_result)
-        
-        openapi_result = await test_endpoint(client, "/openapi.json")
-        test_results.append(openapi_result)
+    # Test basic endpoints
+    basic_tests = [
+        "/",
+        "/health",
+        "/api/v1/health/",
+        "/api/v1/health/database",
+        "/api/v1/health/kobo",
+    ]
+    
+    # Test API endpoints
+    api_tests = [
+        "/api/v1/forms/",
+    ]
+    
+    # Test API documentation; the schema only needs to be reachable, so a
+    # HEAD request avoids downloading it
+    doc_tests = [
+        ("/docs", "GET"),
+        ("/openapi.json", "HEAD"),
+    ]
+    
+    all_endpoints = [(endpoint, "GET") for endpoint in basic_tests + api_tests] + doc_tests
+    
+    print("\n📋 Testing Basic, API and Documentation Endpoints...")
+    print("-" * 40)
+    
+    # The probes are independent, so they run concurrently over a pool
+    # sized to fire them all at once
+    limits = httpx.Limits(
+        max_connections=len(all_endpoints),
+        max_keepalive_connections=len(all_endpoints)
+    )
+    async with httpx.AsyncClient(timeout=TEST_TIMEOUT, limits=limits) as client:
+        test_results = list(await asyncio.gather(
+            *(
+                test_endpoint(client, endpoint, method=method)
+                for endpoint, method in all_endpoints
+            )
+        ))
     
     # Print summary
     print("\n" + "=" * 60)
     print("📊 TEST SUMMARY")
     print("=" * 60)
     
-    successful_tests = [r for r in test_results if r.get("success", False)]
-    failed_tests = [r for r in test_results if not r.get("success", False)]
+    successful_tests = [r for r in test_results if r["success"]]
+    failed_tests = [r for r in test_results if not r["success"]]
     
     print(f"✅ Successful: {len(successful_tests)}")
     print(f"❌ Failed: {len(failed_tests)}")
@@ -117,14 +127,14 @@ async def main():
     if failed_tests:
         print("\n❌ FAILED TESTS:")
         for test in failed_tests:
-            print(f"   - {test['endpoint']}: {test.get('error', 'Unknown error')}")
+            print(f"   - {test['endpoint']}: {test['error'] or 'Unknown error'}")
     
     # Detailed results
     if successful_tests:
         print("\n✅ SUCCESSFUL TESTS:")
         for test in successful_tests:
             response_info = ""
-            if isinstance(test.get("response"), dict):
+            if isinstance(test["response"], dict):
                 if "status" in test["response"]:
                     response_info = f"(Status: {test['response']['status']})"
                 elif "forms" in test["response"]:
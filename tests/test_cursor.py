@@ -0,0 +1,62 @@
+# tests/test_cursor.py
+"""Tests for keyset pagination cursors"""
+
+import base64
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api.v1 import submissions
+from app.services.submission_service import SubmissionService, _decode_cursor, _encode_cursor
+
+
+@pytest.mark.parametrize("created_at, submission_id", [
+    (datetime(2024, 3, 1, 8, 30), uuid.UUID("0190d3a4-5b6c-7d8e-9f01-23456789abcd")),
+    (datetime(2024, 3, 1, 8, 30, 0, 123456), uuid.UUID(int=0)),
+    (datetime(1999, 12, 31, 23, 59, 59, 999999), uuid.UUID(int=2 ** 128 - 1)),
+])
+def test_cursor_round_trip(created_at, submission_id):
+    """Decoding an encoded cursor gives back the same row position"""
+    assert _decode_cursor(_encode_cursor(created_at, submission_id)) == (created_at, submission_id)
+
+
+def test_cursor_is_url_safe():
+    """Cursors go into query strings unescaped"""
+    cursor = _encode_cursor(datetime(2024, 5, 6, 7, 8, 9, 123456), uuid.UUID(int=2 ** 128 - 1))
+    assert all(c.isalnum() or c in "-_=" for c in cursor)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not base64!",
+    base64.urlsafe_b64encode(b"2024-01-01T00:00:00").decode(),
+    base64.urlsafe_b64encode(b"yesterday|" + str(uuid.uuid4()).encode()).decode(),
+    base64.urlsafe_b64encode(b"2024-01-01T00:00:00|not-a-uuid").decode(),
+    base64.urlsafe_b64encode(b"2024-01-01T00:00:00|a|b").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+], ids=["empty", "not-base64", "no-separator", "bad-date", "bad-uuid", "extra-field", "not-utf8"])
+def test_malformed_cursor_raises_value_error(cursor):
+    """Every kind of bad cursor surfaces as ValueError"""
+    with pytest.raises(ValueError):
+        _decode_cursor(cursor)
+
+
+def test_malformed_cursor_is_a_bad_request(tmp_path, monkeypatch):
+    """The list route answers 400, not 500, for a bad cursor"""
+    # The service creates its media directory relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    app = FastAPI()
+    app.include_router(submissions.router, prefix="/submissions")
+    # The cursor is rejected before any query, so the session is never used
+    app.dependency_overrides[submissions.get_submission_service] = (
+        lambda: SubmissionService(Session(), kobo_service=None)
+    )
+    
+    response = TestClient(app).get("/submissions/", params={"cursor": "garbage"})
+    
+    assert response.status_code == 400
+    assert "Invalid cursor" in response.json()["detail"]
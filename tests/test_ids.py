@@ -0,0 +1,39 @@
+# tests/test_ids.py
+"""Tests for time-ordered identifiers"""
+
+import time
+import uuid
+
+from app.utils.ids import uuid7
+
+
+def test_uuid7_version_and_variant():
+    """Every id carries the version 7 and RFC 4122 variant bits"""
+    for _ in range(1000):
+        value = uuid7()
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+
+
+def test_uuid7_embeds_current_unix_milliseconds():
+    """The leading 48 bits are the generation time in milliseconds"""
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+    assert before <= value.int >> 80 <= after
+
+
+def test_uuid7_sorts_by_generation_time():
+    """Ids from later milliseconds sort after earlier ones"""
+    ids = []
+    for _ in range(20):
+        ids.append(uuid7())
+        time.sleep(0.002)
+    assert ids == sorted(ids)
+    assert sorted(ids, key=str) == ids
+
+
+def test_uuid7_random_bits_differ():
+    """Ids generated in the same millisecond are still unique"""
+    ids = {uuid7() for _ in range(10000)}
+    assert len(ids) == 10000
@@ -0,0 +1,127 @@
+# tests/test_kobo_parser.py
+"""Tests for KoboFormParser answer conversion and form parsing"""
+
+import io
+
+import pytest
+
+from app.utils.kobo_parser import KoboFormParser
+
+
+def _parse_location(value):
+    return KoboFormParser._parse_field_value(value, 'location', {})
+
+
+def _point(latitude, longitude, altitude=None, accuracy=None):
+    return {'latitude': latitude, 'longitude': longitude, 'altitude': altitude, 'accuracy': accuracy}
+
+
+def test_geopoint_with_all_four_numbers():
+    assert _parse_location("-1.9441 30.0619 1567.5 4.0") == _point(-1.9441, 30.0619, 1567.5, 4.0)
+
+
+def test_geopoint_with_latitude_and_longitude_only():
+    assert _parse_location("-1.9441 30.0619") == _point(-1.9441, 30.0619)
+    assert _parse_location("-1.9441 30.0619 1567.5") == _point(-1.9441, 30.0619, 1567.5)
+
+
+def test_geopoint_accepts_every_float_spelling():
+    assert _parse_location("+1. .5 1e3 -2.5E-1") == _point(1.0, 0.5, 1000.0, -0.25)
+    assert _parse_location("12 -3") == _point(12.0, -3.0)
+
+
+def test_geopoint_tolerates_surrounding_and_repeated_whitespace():
+    assert _parse_location("  -1.5\t29.25 \n") == _point(-1.5, 29.25)
+
+
+def test_geopoint_extra_tokens_are_ignored():
+    """Anything after the fourth number no longer rejects the answer"""
+    assert _parse_location("-1.5 29.25 1500 4.0 extra") == _point(-1.5, 29.25, 1500.0, 4.0)
+    assert _parse_location("-1.5 29.25 high") == _point(-1.5, 29.25)
+
+
+def test_geopoint_without_coordinates_is_returned_raw():
+    """Latitude and longitude are still required"""
+    for value in ["-1.5", "north 29.25", "-1.5x 29.25", "1.2.3 4"]:
+        assert _parse_location(value) == value
+    assert _parse_location(["-1.5", "29.25"]) == ["-1.5", "29.25"]
+
+
+def test_empty_geopoint_is_none():
+    assert _parse_location("") is None
+
+
+# Kobo asset with the layout details the streaming parser has to handle:
+# content before the top-level scalars, translated labels, groups and notes,
+# and choices written after the survey items that refer to them
+KOBO_ASSET = {
+    'content': {
+        'survey': [
+            {'name': 'start', 'type': 'start'},
+            {'name': 'sighting', 'type': 'begin_group', 'label': 'Sighting'},
+            {'name': 'species', 'type': 'select_one', 'select_from_list_name': 'species',
+             'label': {'English': 'Species', 'French': 'Espèce'}, 'required': True},
+            {'name': 'threats', 'type': 'select_multiple', 'select_from_list_name': 'threats',
+             'label': 'Threats', 'appearance': 'minimal other'},
+            {'name': 'habitat', 'type': 'select_one', 'select_from_list_name': 'missing_list',
+             'label': 'Habitat'},
+            {'name': 'count', 'type': 'integer', 'label': 'Count', 'constraint': {'min': 1, 'max': 50}},
+            {'name': 'weight', 'type': 'decimal', 'label': 'Weight',
+             'bind': {'jr:constraintMsg': {'decimal_places': 2}}},
+            {'name': 'location', 'type': 'geopoint', 'label': 'Location',
+             'bind': {'jr:preload': {'accuracy': 5.5}}},
+            {'name': 'sighting', 'type': 'end_group'},
+            {'name': 'remember', 'type': 'note', 'label': 'Keep your distance'},
+            {'name': 'notes', 'type': 'text', 'label': 'Notes', 'hint': {'default': 'Anything else'}},
+        ],
+        'settings': {'label': {'English': 'Wildlife Sighting'}},
+        'choices': [
+            {'list_name': 'species', 'name': 'elephant', 'label': {'English': 'Elephant'}},
+            {'list_name': 'threats', 'name': 'snare', 'label': 'Snare'},
+            {'list_name': 'species', 'name': 'lion', 'label': 'Lion'},
+        ],
+    },
+    'uid': 'aSightingForm',
+    'name': 'Wildlife Sighting',
+    'date_created': '2024-01-01T00:00:00Z',
+    'date_modified': '2024-02-01T00:00:00Z',
+    'deployment__active': True,
+    'owner__username': 'ranger',
+    'permissions': [{'permission': 'view_asset'}],
+}
+
+
+def _asset_file():
+    orjson = pytest.importorskip("orjson")
+    pytest.importorskip("ijson")
+    return io.BytesIO(orjson.dumps(KOBO_ASSET))
+
+
+def test_streaming_parser_matches_dict_parser():
+    """Parsing from a file gives the same result as parsing the loaded dict"""
+    parsed = KoboFormParser.parse_form_content_stream(_asset_file())
+    
+    assert parsed == KoboFormParser._parse_form_content(KOBO_ASSET)
+    assert parsed['form_id'] == 'aSightingForm'
+    assert parsed['form_title'] == 'Wildlife Sighting'
+    assert parsed['permissions'] == [{'permission': 'view_asset'}]
+
+
+def test_streaming_parser_skips_non_questions_and_attaches_choices():
+    questions = {q['name']: q for q in KoboFormParser.parse_form_content_stream(_asset_file())['questions']}
+    
+    assert list(questions) == ['species', 'threats', 'habitat', 'count', 'weight', 'location', 'notes']
+    assert questions['species']['label'] == 'Species'
+    assert questions['species']['choices'] == [
+        {'name': 'elephant', 'label': 'Elephant'},
+        {'name': 'lion', 'label': 'Lion'},
+    ]
+    assert questions['threats']['allow_other'] is True
+    assert 'choices' not in questions['habitat']
+    assert questions['count']['max_value'] == 50
+    assert questions['location']['accuracy_threshold'] == 5.5
+
+
+def test_iter_form_questions_yields_the_parsed_questions():
+    expected = KoboFormParser._parse_form_content(KOBO_ASSET)['questions']
+    assert list(KoboFormParser.iter_form_questions(_asset_file())) == expected
@@ -0,0 +1,132 @@
+# tests/test_kobo_validator.py
+"""Tests for compiled submission validators and per-revision caching"""
+
+from app.utils.kobo_parser import KoboFormParser
+
+YES_NO = [{'name': 'yes', 'label': 'Yes'}, {'name': 'no', 'label': 'No'}]
+
+FORM = {
+    'form_id': 'validator_form',
+    'modified_at': '2024-01-01T00:00:00Z',
+    'questions': [
+        {'name': 'observer', 'label': 'Observer', 'type': 'text', 'required': True},
+        {'name': 'count', 'label': 'Count', 'type': 'number'},
+        {'name': 'weight', 'label': 'Weight', 'type': 'decimal'},
+        {'name': 'injured', 'label': 'Injured', 'type': 'single_choice', 'choices': YES_NO},
+        {'name': 'calves', 'label': 'Calves', 'type': 'single_choice', 'choices': YES_NO},
+        {'name': 'threats', 'label': 'Threats', 'type': 'multiple_choice', 'choices': [
+            {'name': 'snare', 'label': 'Snare'},
+            {'name': 'fire', 'label': 'Fire'},
+        ]},
+        {'name': 'untitled', 'type': 'number', 'required': True},
+    ],
+}
+
+VALID = {
+    'observer': 'jane',
+    'count': '4',
+    'weight': '12.5',
+    'injured': 'no',
+    'calves': 'yes',
+    'threats': ['snare', 'fire'],
+    'untitled': 1,
+}
+
+
+def _validate(**changes):
+    submission = dict(VALID, **changes)
+    return KoboFormParser.compile_validator(FORM)(submission)
+
+
+def test_valid_submission_has_no_errors():
+    assert _validate() == {}
+    assert KoboFormParser.validate_submission_data(VALID, FORM) == {}
+
+
+def test_missing_required_answer():
+    assert _validate(observer='') == {'observer': ['Observer is required']}
+    assert _validate(observer=None) == {'observer': ['Observer is required']}
+
+
+def test_required_message_falls_back_to_field_name():
+    assert _validate(untitled=None) == {'untitled': ['untitled is required']}
+
+
+def test_optional_questions_may_be_left_out():
+    submission = {'observer': 'jane', 'untitled': 1}
+    assert KoboFormParser.compile_validator(FORM)(submission) == {}
+
+
+def test_number_and_decimal_must_convert():
+    assert _validate(count='four') == {'count': ['Count must be a number']}
+    assert _validate(count='4.5') == {'count': ['Count must be a number']}
+    assert _validate(weight='heavy') == {'weight': ['Weight must be a decimal number']}
+    assert _validate(weight=[1]) == {'weight': ['Weight must be a decimal number']}
+
+
+def test_single_choice_must_be_a_listed_choice():
+    assert _validate(injured='maybe') == {'injured': ['Invalid choice for Injured']}
+    # Questions sharing one choice list are checked independently
+    assert _validate(calves='maybe') == {'calves': ['Invalid choice for Calves']}
+
+
+def test_multiple_choice_reports_each_invalid_selection():
+    assert _validate(threats=['snare', 'drought', 'flood']) == {
+        'threats': ["Invalid choice 'drought' for Threats", "Invalid choice 'flood' for Threats"]
+    }
+    assert _validate(threats='fire') == {}
+
+
+def test_unhashable_answers_are_invalid_choices():
+    assert _validate(injured=['yes']) == {'injured': ['Invalid choice for Injured']}
+    assert _validate(threats=[['snare']]) == {'threats': ["Invalid choice '['snare']' for Threats"]}
+
+
+def _choice_form(form_id, choice_name, modified_at=None):
+    """One single-choice question, with one valid choice"""
+    form = {
+        'form_id': form_id,
+        'questions': [{
+            'name': 'species',
+            'label': 'Species',
+            'type': 'single_choice',
+            'choices': [{'name': choice_name, 'label': choice_name}],
+        }],
+    }
+    if modified_at is not None:
+        form['modified_at'] = modified_at
+    return form
+
+
+def test_forms_without_revision_are_not_cached():
+    """A new revision of a form lacking modified_at is validated afresh"""
+    old = _choice_form('unversioned_form', 'lion')
+    new = _choice_form('unversioned_form', 'elephant')
+    
+    assert KoboFormParser.validate_submission_data({'species': 'lion'}, old) == {}
+    assert KoboFormParser.validate_submission_data({'species': 'lion'}, new) == {
+        'species': ['Invalid choice for Species']
+    }
+
+
+def test_revisions_are_cached_separately():
+    """Each (form_id, modified_at) revision gets its own validator"""
+    old = _choice_form('versioned_form', 'lion', '2024-01-01T00:00:00Z')
+    new = _choice_form('versioned_form', 'elephant', '2024-02-01T00:00:00Z')
+    
+    assert KoboFormParser.validate_submission_data({'species': 'lion'}, old) == {}
+    assert KoboFormParser.validate_submission_data({'species': 'elephant'}, new) == {}
+    assert KoboFormParser.validate_submission_data({'species': 'lion'}, new) != {}
+
+
+def test_question_map_and_parse_ignore_cache_without_revision():
+    """Question maps and raw-form parses are not cached under (id, None)"""
+    form = {'form_id': 'unversioned_map', 'questions': [{'name': 'count', 'type': 'number'}]}
+    assert KoboFormParser.parse_submission_data({'count': '5'}, form) == {'count': 5}
+    form = {'form_id': 'unversioned_map', 'questions': [{'name': 'count', 'type': 'text'}]}
+    assert KoboFormParser.parse_submission_data({'count': '5'}, form) == {'count': '5'}
+    
+    raw = {'uid': 'unversioned_raw', 'content': {'survey': [{'name': 'a', 'type': 'text'}]}}
+    assert [q['name'] for q in KoboFormParser.parse_form_content(raw)['questions']] == ['a']
+    raw = {'uid': 'unversioned_raw', 'content': {'survey': [{'name': 'b', 'type': 'text'}]}}
+    assert [q['name'] for q in KoboFormParser.parse_form_content(raw)['questions']] == ['b']
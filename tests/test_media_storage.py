@@ -0,0 +1,73 @@
+# tests/test_media_storage.py
+"""Tests for chunked base64 media decoding"""
+
+import base64
+import binascii
+import os
+
+import pytest
+
+from app.services import submission_service
+from app.services.submission_service import _write_base64_file
+
+# 1x1 PNG, long enough to span several 8-character chunks
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChAGA6x8pNwAAAABJRU5ErkJggg=="
+)
+PNG_B64 = base64.b64encode(PNG).decode()
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    """Chunks of a few characters, so short payloads span many of them"""
+    monkeypatch.setattr(submission_service, "_BASE64_CHUNK", 8)
+
+
+@pytest.fixture
+def file_path(tmp_path):
+    return str(tmp_path / "media.png")
+
+
+def _read(file_path):
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+def test_plain_base64_across_many_chunks(file_path):
+    _write_base64_file(PNG_B64, file_path)
+    assert _read(file_path) == PNG
+
+
+def test_line_wrapped_base64(file_path):
+    """MIME-style 76-column lines with CRLF endings"""
+    wrapped = "\r\n".join(PNG_B64[i:i + 76] for i in range(0, len(PNG_B64), 76))
+    _write_base64_file(wrapped, file_path)
+    assert _read(file_path) == PNG
+
+
+def test_whitespace_that_would_shift_chunk_boundaries(file_path):
+    """A tab and spaces inside the first chunk, which used to misalign the rest"""
+    _write_base64_file(PNG_B64[:3] + "\t " + PNG_B64[3:6] + "  " + PNG_B64[6:] + "\n", file_path)
+    assert _read(file_path) == PNG
+
+
+def test_data_uri(file_path):
+    _write_base64_file("data:image/png;base64," + PNG_B64, file_path)
+    assert _read(file_path) == PNG
+
+
+def test_empty_payload_writes_an_empty_file(file_path):
+    _write_base64_file("", file_path)
+    assert _read(file_path) == b""
+
+
+@pytest.mark.parametrize("bad", [
+    "AAAA!AAA" + PNG_B64,
+    PNG_B64[:24] + "-_AA" + PNG_B64[24:],
+    "AAAA=AAAAAAA",
+], ids=["bad-char-first-chunk", "urlsafe-chars-later-chunk", "padding-mid-stream"])
+def test_invalid_input_leaves_no_file_behind(file_path, bad):
+    """A decode error midway removes the partly written file"""
+    with pytest.raises(binascii.Error):
+        _write_base64_file(bad, file_path)
+    assert not os.path.exists(file_path)
@@ -0,0 +1,126 @@
+# tests/test_radius_filter.py
+"""Tests for the bbox prefilter of radius queries"""
+
+import math
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api.v1 import submissions
+from app.services.submission_service import (
+    SubmissionService,
+    WITHIN_RADIUS,
+    WITHIN_RADIUS_EXACT,
+    _radius_filter,
+    _radius_in_degrees,
+)
+
+# Mean earth radius used by ST_DWithin(..., use_spheroid => false)
+EARTH_RADIUS_M = 6371008.7714
+
+
+def _destination(latitude, longitude, bearing, distance_m):
+    """Point reached from (latitude, longitude) along bearing on the sphere"""
+    lat = math.radians(latitude)
+    angle = distance_m / EARTH_RADIUS_M
+    dest_lat = math.asin(
+        math.sin(lat) * math.cos(angle) + math.cos(lat) * math.sin(angle) * math.cos(bearing)
+    )
+    dest_lon = math.radians(longitude) + math.atan2(
+        math.sin(bearing) * math.sin(angle) * math.cos(lat),
+        math.cos(angle) - math.sin(lat) * math.sin(dest_lat)
+    )
+    return math.degrees(dest_lat), math.degrees(dest_lon)
+
+
+@pytest.mark.parametrize(
+    "latitude, longitude, radius_m, bearing_deg",
+    [
+        pytest.param(0.0, 30.0, 5_000.0, 0.0, id="equator-due-north"),
+        pytest.param(0.0, 30.0, 5_000.0, 90.0, id="equator-due-east"),
+        pytest.param(-1.9441, 30.0619, 50.0, 225.0, id="kigali-south-west"),
+        pytest.param(60.0, 10.0, 500_000.0, 90.0, id="high-latitude-due-east"),
+        pytest.param(60.0, 10.0, 500_000.0, 82.17, id="high-latitude-widest-point"),
+        pytest.param(-70.0, 100.0, 1_000_000.0, 270.0, id="southern-large-radius-due-west"),
+    ],
+)
+def test_bbox_covers_the_boundary_circle(latitude, longitude, radius_m, bearing_deg):
+    """A point exactly radius_m away stays inside the prefilter bbox"""
+    clause, params = _radius_filter(latitude, longitude, radius_m)
+    assert clause is WITHIN_RADIUS
+    
+    half_width = params["radius_deg"]
+    point_lat, point_lon = _destination(latitude, longitude, math.radians(bearing_deg), radius_m)
+    assert abs(point_lat - latitude) <= half_width
+    assert abs(point_lon - longitude) <= half_width
+
+
+@pytest.mark.parametrize("latitude", [89.99, 89.5, -89.99])
+def test_circles_reaching_a_pole_skip_the_bbox(latitude):
+    """No finite longitude range covers a circle around a pole"""
+    radius_m = 100_000.0
+    assert _radius_in_degrees(radius_m, latitude) == math.inf
+    clause, params = _radius_filter(latitude, 10.0, radius_m)
+    assert clause is WITHIN_RADIUS_EXACT
+    assert "radius_deg" not in params
+
+
+@pytest.mark.parametrize("longitude", [179.99, -179.99, 180.0])
+def test_circles_crossing_the_antimeridian_skip_the_bbox(longitude):
+    """The geometry bbox does not wrap at +/-180 degrees longitude"""
+    clause, params = _radius_filter(0.0, longitude, 5_000.0)
+    assert clause is WITHIN_RADIUS_EXACT
+    assert params == {"near_lat": 0.0, "near_lon": longitude, "radius_m": 5_000.0}
+
+
+def test_ordinary_circles_use_the_bbox():
+    """Away from the poles and the antimeridian the indexable bbox is kept"""
+    clause, params = _radius_filter(-1.9441, 30.0619, 5_000.0)
+    assert clause is WITHIN_RADIUS
+    assert 0 < params["radius_deg"] < 0.1
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """List route client whose service never reaches the database"""
+    # The service creates its media directory relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    app = FastAPI()
+    app.include_router(submissions.router, prefix="/submissions")
+    app.dependency_overrides[submissions.get_submission_service] = (
+        lambda: SubmissionService(Session(), kobo_service=None)
+    )
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        pytest.param({"latitude": -1.9, "longitude": 30.1}, id="missing-radius"),
+        pytest.param({"latitude": -1.9, "radius_m": 500}, id="missing-longitude"),
+        pytest.param({"radius_m": 500}, id="radius-only"),
+    ],
+)
+def test_incomplete_radius_filter_is_a_bad_request(client, params):
+    """A partial radius filter is rejected instead of being silently ignored"""
+    response = client.get("/submissions/", params=params)
+    
+    assert response.status_code == 400
+    assert "must be given together" in response.json()["detail"]
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        pytest.param({"latitude": 90.5, "longitude": 0, "radius_m": 500}, id="latitude-above-90"),
+        pytest.param({"latitude": 0, "longitude": -180.5, "radius_m": 500}, id="longitude-below-minus-180"),
+        pytest.param({"latitude": 0, "longitude": 0, "radius_m": 0}, id="zero-radius"),
+    ],
+)
+def test_out_of_range_radius_filter_is_rejected(client, params):
+    """Coordinates and radius are range-checked before the service runs"""
+    response = client.get("/submissions/", params=params)
+    
+    assert response.status_code == 422
@@ -0,0 +1,51 @@
+# tests/test_submission_digest.py
+"""Tests for the retry-deduplication payload digest"""
+
+from datetime import datetime
+
+from app.schemas.submission_schemas import FormSubmissionCreate
+from app.services.submission_service import _payload_digest
+
+
+def _submission(**overrides):
+    fields = {
+        "kobo_form_id": "wildlife_survey_001",
+        "submission_data": {"species": "elephant", "notes": ""},
+        "device_id": "device_1",
+        "submitted_at": datetime(2024, 3, 1, 8, 30),
+    }
+    fields.update(overrides)
+    return FormSubmissionCreate(**fields)
+
+
+def _photo(file_data):
+    return {
+        "filename": "photo.jpg",
+        "file_type": "image",
+        "mime_type": "image/jpeg",
+        "file_size": 3,
+        "question_name": "evidence_photo",
+        "file_data": file_data,
+    }
+
+
+def test_identical_retry_has_the_same_digest():
+    media = [_photo("AAAA")]
+    assert _payload_digest(_submission(media_files=media)) == _payload_digest(_submission(media_files=media))
+
+
+def test_different_media_is_a_different_submission():
+    without_media = _payload_digest(_submission())
+    with_photo = _payload_digest(_submission(media_files=[_photo("AAAA")]))
+    with_other_photo = _payload_digest(_submission(media_files=[_photo("BBBB")]))
+    assert len({without_media, with_photo, with_other_photo}) == 3
+
+
+def test_separate_observations_with_the_same_answers_differ():
+    first = _payload_digest(_submission())
+    assert _payload_digest(_submission(submitted_at=datetime(2024, 3, 1, 9, 0))) != first
+    assert _payload_digest(_submission(device_id="device_2")) != first
+
+
+def test_integers_wider_than_64_bits_are_accepted():
+    assert len(_payload_digest(_submission(submission_data={"count": 2 ** 70}))) == 64